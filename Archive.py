@@ -0,0 +1,231 @@
+import os
+import time
+import sqlite3
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import zstandard
+
+import Store
+import Snapshot
+import Rollups
+import SingleFlight
+
+# ---------------- Constants ----------------
+# archive/data.zst holds back-to-back zstd frames; archive/index.db maps each
+# (EffectiveDate, state, commodity, type) to its frame, so any report can be
+# read back with one seek and one decompress.
+ARCHIVE_DIR = "archive"
+DATA_FILE = "data.zst"
+INDEX_FILE = "index.db"
+
+COMPRESSION_LEVEL = 19
+DICT_SIZE = 112 * 1024
+TRAIN_MIN_SAMPLES = 20   # responses archived before the first dictionary is trained
+TRAIN_MAX_SAMPLES = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frames (
+    effective_date TEXT NOT NULL,
+    state TEXT NOT NULL, commodity TEXT NOT NULL, type TEXT NOT NULL,
+    offset INTEGER NOT NULL, length INTEGER NOT NULL, raw_length INTEGER NOT NULL,
+    dict_id INTEGER NOT NULL,   -- 0 = no dictionary
+    fingerprint TEXT NOT NULL,
+    archived_at INTEGER NOT NULL,
+    PRIMARY KEY (effective_date, state, commodity, type)
+);
+CREATE TABLE IF NOT EXISTS dictionaries (
+    dict_id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL,
+    trained_at INTEGER NOT NULL
+);
+"""
+
+# Per process: trained dictionaries by dict_id
+_dicts = {}
+
+# ---------------- Container ----------------
+def path(name, archive_dir=None):
+    return os.path.join(archive_dir or ARCHIVE_DIR, name)
+
+def connect(archive_dir=None):
+    os.makedirs(archive_dir or ARCHIVE_DIR, exist_ok=True)
+    conn = sqlite3.connect(path(INDEX_FILE, archive_dir), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def dictionary(conn, dict_id):
+    if dict_id not in _dicts:
+        data = conn.execute("SELECT data FROM dictionaries WHERE dict_id=?", (dict_id,)).fetchone()[0]
+        _dicts[dict_id] = zstandard.ZstdCompressionDict(data)
+    return _dicts[dict_id]
+
+def latest_dict_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(dict_id), 0) FROM dictionaries").fetchone()[0]
+
+def read_frame(conn, row, archive_dir=None):
+    with open(path(DATA_FILE, archive_dir), "rb") as f:
+        f.seek(row["offset"])
+        frame = f.read(row["length"])
+
+    if row["dict_id"]:
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary(conn, row["dict_id"]))
+    else:
+        decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(frame, max_output_size=row["raw_length"]).decode("utf-8")
+
+# ---------------- Write ----------------
+def archive(effective_date, state_value, commodity_value, type_value, html, fingerprint, archive_dir=None):
+    key = (Store.iso_date(effective_date), state_value, commodity_value, type_value)
+
+    # One writer at a time across processes; the data file is append-only
+    with SingleFlight.lock(SingleFlight.key_name("archive", os.path.abspath(archive_dir or ARCHIVE_DIR))):
+        conn = connect(archive_dir)
+        try:
+            existing = conn.execute(
+                "SELECT fingerprint FROM frames WHERE effective_date=? AND state=? AND commodity=? AND type=?", key
+            ).fetchone()
+            if existing and existing[0] == fingerprint:
+                return False
+
+            dict_id = latest_dict_id(conn)
+            if not dict_id and conn.execute("SELECT COUNT(*) FROM frames").fetchone()[0] >= TRAIN_MIN_SAMPLES:
+                dict_id = train(conn, archive_dir)
+
+            if dict_id:
+                compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL, dict_data=dictionary(conn, dict_id))
+            else:
+                compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+
+            raw = html.encode("utf-8")
+            frame = compressor.compress(raw)
+            with open(path(DATA_FILE, archive_dir), "ab") as f:
+                offset = f.tell()
+                f.write(frame)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # A re-published report gets a new frame; the old one is left unreferenced
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO frames VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    key + (offset, len(frame), len(raw), dict_id, fingerprint, int(time.time()))
+                )
+            logging.info(f"Archived {type_value} for {key[0]}: {len(raw)} -> {len(frame)} bytes")
+            return True
+        finally:
+            conn.close()
+
+def train(conn, archive_dir=None):
+    # These pages are near-identical, so a dictionary trained on earlier
+    # responses carries most of the markup and the frames shrink to the numbers
+    rows = conn.execute(
+        "SELECT * FROM frames ORDER BY archived_at DESC LIMIT ?", (TRAIN_MAX_SAMPLES,)
+    ).fetchall()
+    samples = [read_frame(conn, row, archive_dir).encode("utf-8") for row in rows]
+    trained = zstandard.train_dictionary(DICT_SIZE, samples)
+
+    dict_id = latest_dict_id(conn) + 1
+    with conn:
+        conn.execute(
+            "INSERT INTO dictionaries VALUES (?, ?, ?)", (dict_id, trained.as_bytes(), int(time.time()))
+        )
+    logging.info(f"Trained archive dictionary {dict_id} on {len(samples)} responses")
+    return dict_id
+
+# ---------------- Read ----------------
+def entries(conn, since=None):
+    if since:
+        return conn.execute(
+            "SELECT * FROM frames WHERE effective_date >= ? ORDER BY effective_date", (Store.iso_date(since),)
+        ).fetchall()
+    return conn.execute("SELECT * FROM frames ORDER BY effective_date").fetchall()
+
+def load(effective_date, state_value, commodity_value, type_value, archive_dir=None):
+    conn = connect(archive_dir)
+    try:
+        row = conn.execute(
+            "SELECT * FROM frames WHERE effective_date=? AND state=? AND commodity=? AND type=?",
+            (Store.iso_date(effective_date), state_value, commodity_value, type_value)
+        ).fetchone()
+        return read_frame(conn, row, archive_dir) if row else None
+    finally:
+        conn.close()
+
+# ---------------- Re-parse ----------------
+def reparse_entry(args):
+    # Runs in a worker process: decompress one frame and parse it
+    import LRP
+
+    entry, archive_dir = args
+    conn = connect(archive_dir)
+    try:
+        html = read_frame(conn, entry, archive_dir)
+    finally:
+        conn.close()
+
+    return {
+        "effective_date": entry["effective_date"],
+        "state": entry["state"],
+        "commodity": entry["commodity"],
+        "type": entry["type"],
+        "rows": LRP.parse_rows(html),
+    }
+
+def reparse(workers=None, since=None, archive_dir=None, store_path=None):
+    # Rebuilds the history store from the archive alone; no network traffic
+    conn = connect(archive_dir)
+    try:
+        todo = [(dict(row), archive_dir) for row in entries(conn, since)]
+    finally:
+        conn.close()
+
+    store = Store.connect(store_path)
+    count = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(reparse_entry, todo, chunksize=8):
+                Store.ingest({f"{result['type']}@{result['effective_date']}": result}, store)
+                count += 1
+        Rollups.rebuild(store)
+        Snapshot.publish(store)
+    finally:
+        store.close()
+
+    logging.info(f"Re-parsed {count} archived report(s)")
+    return count
+
+# ---------------- Run ----------------
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    # python Archive.py reparse [--workers N] [--since 2026-01-01]
+    # python Archive.py train
+    # python Archive.py stats
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["reparse", "train", "stats"])
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--since")
+    parser.add_argument("--dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "reparse":
+        reparse(args.workers, args.since, args.dir)
+    elif args.command == "train":
+        conn = connect(args.dir)
+        try:
+            train(conn, args.dir)
+        finally:
+            conn.close()
+    else:
+        conn = connect(args.dir)
+        try:
+            count, raw, packed = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_length), 0), COALESCE(SUM(length), 0) FROM frames"
+            ).fetchone()
+            print(f"{count} reports, {raw} bytes raw, {packed} bytes archived "
+                  f"({packed / raw if raw else 0:.1%}), dictionary {latest_dict_id(conn) or 'none'}")
+        finally:
+            conn.close()
@@ -0,0 +1,379 @@
+import os
+import json
+import time
+import base64
+import random
+import logging
+import argparse
+import tempfile
+import resource
+import threading
+import statistics
+import multiprocessing
+from urllib.parse import parse_qs, urlparse, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ---------------- Constants ----------------
+# Runs the real Run.run pipeline (wizard, parse, archive, store, Sheets sink)
+# against two local servers: a stand-in for the RMA wizard and a fake Sheets
+# values endpoint. Each (matrix size, concurrency) cell gets a fresh working
+# directory, and its reports are split across that many worker processes.
+WIZARD_PATH = "/livestockreports/LRPReport"
+SPREADSHEET_ID = "bench"
+
+EFFECTIVE_DATES = ["10/17/2026", "10/16/2026", "10/15/2026"]
+COMMODITY = "0801|Feeder Cattle"
+TYPES_PER_STATE = 5
+WEEKS = [13, 17, 21, 26, 30, 34, 39, 43, 47, 52]
+LEVELS_PER_WEEK = 15
+
+STEPS = ["EffectiveDate", "StateSelection", "CommoditySelection", "TypeSelection"]
+
+# ---------------- Report Matrix ----------------
+def matrix(size):
+    # size reports, TYPES_PER_STATE per state, like the production layout
+    reports = []
+    for i in range(size):
+        state = 10 + i // TYPES_PER_STATE
+        type_code = 809 + i % TYPES_PER_STATE
+        reports.append({
+            "name": f"S{state}T{type_code}",
+            "state": f"{state:02d}|State {state:02d}",
+            "commodity": COMMODITY,
+            "type": f"{type_code}|Type {type_code}",
+        })
+    return reports
+
+# ---------------- RMA Stand-in ----------------
+def encode_viewstate(state, padding):
+    # Opaque like the real thing, and as heavy: every post carries it back
+    blob = json.dumps(state).encode("utf-8") + b"\0" + b"x" * padding
+    return base64.b64encode(blob).decode("ascii")
+
+def decode_viewstate(text):
+    blob = base64.b64decode(text)
+    return json.loads(blob.split(b"\0", 1)[0])
+
+def select_html(name, options):
+    items = "".join(f'<option value="{value}">{label}</option>' for value, label in options)
+    return f'<select id="{name}" name="{name}">{items}</select>'
+
+def wizard_page(state, name, options, padding):
+    return (
+        "<html><body><form method=\"post\">"
+        f'<input type="hidden" name="__VIEWSTATE" value="{encode_viewstate(state, padding)}">'
+        f'<input type="hidden" name="__EVENTVALIDATION" value="{random.getrandbits(64):x}">'
+        f"{select_html(name, options)}"
+        '<input type="submit" name="buttonType" value="Next &gt;&gt;">'
+        "</form></body></html>"
+    )
+
+def report_page(state, padding):
+    # Same header words as the live report; prices vary by selection and date
+    rng = random.Random("|".join(state.values()))
+    header = ("<tr><th>Endorsement Length (Weeks)</th><th>Coverage Price</th><th>Expected Ending Value</th>"
+              "<th>Coverage Level</th><th>Rate</th><th>Cost Per Cwt</th><th>End Date</th>"
+              "<th>Producer Premium</th></tr>")
+    tables = []
+    for weeks in WEEKS:
+        rows = []
+        base = rng.uniform(220, 340)
+        for i in range(LEVELS_PER_WEEK):
+            level = 1.0 - i * 0.0125
+            cost = base * (0.002 + i * 0.001) * weeks / 13
+            rows.append(
+                f"<tr><td>{weeks}</td><td>${base * level:.2f}</td><td>${base:.2f}</td>"
+                f"<td>{level:.2%}</td><td>{cost / base:.6f}</td><td>${cost:.2f}</td>"
+                f"<td>01/01/2027</td><td>${cost * 0.6:.2f}</td></tr>"
+            )
+        tables.append(f"<table>{header}{''.join(rows)}</table>")
+    return (
+        "<html><body>"
+        f'<input type="hidden" name="__VIEWSTATE" value="{encode_viewstate(state, padding)}">'
+        f"{''.join(tables)}</body></html>"
+    )
+
+class WizardHandler(BaseHTTPRequestHandler):
+    # Walks EffectiveDate -> State -> Commodity -> Type like the live form. A post
+    # is only accepted with the ViewState of the step before it.
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body):
+        time.sleep(self.server.latency)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.count("rma")
+
+    def do_GET(self):
+        if urlparse(self.path).path != WIZARD_PATH:
+            return self.reply(404, "not found")
+        options = [[d, d] for d in EFFECTIVE_DATES]
+        self.reply(200, wizard_page({"step": 0}, "EffectiveDate", options, self.server.padding))
+
+    def do_POST(self):
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode()).items()}
+        try:
+            state = decode_viewstate(form["__VIEWSTATE"])
+            step = state.pop("step")
+            field = STEPS[step]
+            value = form[field]
+        except (KeyError, IndexError, ValueError):
+            return self.reply(500, "<html><body>Invalid postback or callback argument.</body></html>")
+
+        allowed = [v for v, _ in self.server.options(step, state)]
+        if value not in allowed:
+            return self.reply(500, f"<html><body>Invalid value for {field}.</body></html>")
+
+        state[field] = value
+        if step + 1 == len(STEPS):
+            if form.get("buttonType") != "Create Report":
+                return self.reply(500, "<html><body>Unexpected button.</body></html>")
+            return self.reply(200, report_page(state, self.server.padding))
+
+        page = wizard_page(
+            dict(state, step=step + 1), STEPS[step + 1], self.server.options(step + 1, state), self.server.padding
+        )
+        self.reply(200, page)
+
+class LocalServer(ThreadingHTTPServer):
+    # On an ephemeral loopback port, counting requests by kind
+    daemon_threads = True
+
+    def __init__(self, handler, latency):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.latency = latency
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    def count(self, kind):
+        with self.lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+class WizardServer(LocalServer):
+    def __init__(self, reports, latency, padding):
+        super().__init__(WizardHandler, latency)
+        self.reports = reports
+        self.padding = padding
+
+    def options(self, step, state):
+        if step == 0:
+            return [[d, d] for d in EFFECTIVE_DATES]
+        if step == 1:
+            values = sorted({r["state"] for r in self.reports})
+        elif step == 2:
+            values = sorted({r["commodity"] for r in self.reports if r["state"] == state["StateSelection"]})
+        else:
+            values = sorted({
+                r["type"] for r in self.reports
+                if r["state"] == state["StateSelection"] and r["commodity"] == state["CommoditySelection"]
+            })
+        return [[v, v.split("|", 1)[1]] for v in values]
+
+# ---------------- Fake Sheets ----------------
+class SheetsHandler(BaseHTTPRequestHandler):
+    # Just enough of spreadsheets.values for SheetsClient: get, batchClear, batchUpdate
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, body):
+        time.sleep(self.server.latency)
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.server.count("sheets.get")
+        range_ = unquote(urlparse(self.path).path.rsplit("/values/", 1)[-1])
+        self.reply({"range": range_, "values": []})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        path = urlparse(self.path).path
+        if path.endswith(":batchClear"):
+            self.server.count("sheets.batchClear")
+            self.reply({"clearedRanges": body.get("ranges", [])})
+        else:
+            self.server.count("sheets.batchUpdate")
+            data = body.get("data", [])
+            self.reply({"totalUpdatedCells": sum(len(r) for d in data for r in d["values"])})
+
+def start(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+# ---------------- Worker ----------------
+def configure(rma_url, sheets_url, reports):
+    # Points this process's modules at the local servers
+    import Config
+    import LRP
+    import Quota
+    from google.auth.credentials import AnonymousCredentials
+    from googleapiclient.discovery import build
+
+    LRP.URL = rma_url + WIZARD_PATH
+    Config.REPORTS = reports
+    Config.TARGETS = [{"spreadsheet_id": SPREADSHEET_ID}]
+    Config.SINKS = {"sheets": {"kind": "sheets"}}
+    Config.DEFAULT_SINKS = ["sheets"]
+    Config.HERDS = {}
+    Config.CHANGES_RANGE = None
+    Config.CALCULATOR_RANGE = None
+    Config.ROLLUP_RANGE = None
+
+    creds = AnonymousCredentials()
+    service = build("sheets", "v4", credentials=creds, static_discovery=True,
+                    client_options={"api_endpoint": sheets_url})
+    return Quota.SheetsClient(service, creds)
+
+def instrument(timings):
+    # Per report: from its wizard load to the end of the Sheets batch carrying it
+    import LRP
+    import Sinks
+
+    load_page, dispatch, deliver = LRP.load_page, Sinks.dispatch, Sinks.SheetsSink.deliver
+    current = {}
+
+    def timed_load_page(session):
+        current["started"] = time.perf_counter()
+        return load_page(session)
+
+    def timed_dispatch(sinks, report, record):
+        timings[record["name"]] = [current["started"], None]
+        return dispatch(sinks, report, record)
+
+    def timed_deliver(self, batch):
+        deliver(self, batch)
+        done = time.perf_counter()
+        for record in batch:
+            timings[record["name"]][1] = done
+
+    LRP.load_page = timed_load_page
+    Sinks.dispatch = timed_dispatch
+    Sinks.SheetsSink.deliver = timed_deliver
+
+def worker(workdir, rma_url, sheets_url, reports, names, results):
+    os.chdir(workdir)
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        import LRP
+        import Run
+
+        client = configure(rma_url, sheets_url, reports)
+        timings = {}
+        instrument(timings)
+
+        Run.run(names, session=LRP.new_session(), client=client)
+        latencies = [end - begin for begin, end in timings.values() if end is not None]
+        results.put({
+            "latencies": latencies,
+            "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "error": None,
+        })
+    except Exception as e:
+        logging.exception("Bench worker failed")
+        results.put({"latencies": [], "rss_kb": 0, "error": repr(e)})
+
+# ---------------- Sweep ----------------
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+def run_cell(size, concurrency, latency, sheets_latency, padding):
+    reports = matrix(size)
+    wizard = WizardServer(reports, latency, padding)
+    sheets = LocalServer(SheetsHandler, sheets_latency)
+    rma_url, sheets_url = start(wizard), start(sheets)
+
+    # Spawned, not forked, so each worker's peak RSS is its own
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    shards = [[r["name"] for r in reports[i::concurrency]] for i in range(concurrency)]
+    shards = [s for s in shards if s]
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="lrp-bench-") as workdir:
+            began = time.perf_counter()
+            procs = [
+                ctx.Process(target=worker, args=(workdir, rma_url, sheets_url, reports, shard, results))
+                for shard in shards
+            ]
+            for p in procs:
+                p.start()
+            outcomes = [results.get() for _ in procs]
+            for p in procs:
+                p.join()
+            wall = time.perf_counter() - began
+    finally:
+        wizard.shutdown()
+        sheets.shutdown()
+
+    latencies = sorted(l for o in outcomes for l in o["latencies"])
+    errors = [o["error"] for o in outcomes if o["error"]]
+    return {
+        "reports": size,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "reports_per_s": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_s": round(percentile(latencies, 50), 3),
+        "p95_s": round(percentile(latencies, 95), 3),
+        "peak_rss_mb": round(max(o["rss_kb"] for o in outcomes) / 1024, 1),
+        "rma_requests": wizard.requests.get("rma", 0),
+        "sheets_requests": sum(sheets.requests.values()),
+        "completed": len(latencies),
+        "errors": errors,
+    }
+
+def sweep(sizes, concurrency_levels, latency, sheets_latency, padding):
+    cells = []
+    for size in sizes:
+        for concurrency in concurrency_levels:
+            cell = run_cell(size, concurrency, latency, sheets_latency, padding)
+            logging.info(f"{size} reports x {concurrency} worker(s): {cell['wall_s']}s, {cell['reports_per_s']}/s")
+            cells.append(cell)
+    return cells
+
+def format_report(cells):
+    columns = ["reports", "concurrency", "wall_s", "reports_per_s", "p50_s", "p95_s",
+               "peak_rss_mb", "rma_requests", "sheets_requests", "completed"]
+    lines = ["\t".join(columns)]
+    for cell in cells:
+        lines.append("\t".join(str(cell[c]) for c in columns))
+        for error in cell["errors"]:
+            lines.append(f"  error: {error}")
+    return "\n".join(lines)
+
+# ---------------- Run ----------------
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    # python Bench.py [--sizes 5 20 60] [--concurrency 1 2 4] [--latency 0.05]
+    #                 [--sheets-latency 0.02] [--viewstate-kb 20] [--json bench.json]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 20, 60])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per RMA response")
+    parser.add_argument("--sheets-latency", type=float, default=0.02, help="seconds per Sheets response")
+    parser.add_argument("--viewstate-kb", type=int, default=20)
+    parser.add_argument("--json", help="also write the cells as JSON here")
+    args = parser.parse_args()
+
+    cells = sweep(args.sizes, args.concurrency, args.latency, args.sheets_latency, args.viewstate_kb * 1024)
+    print(format_report(cells))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(cells, f, indent=2)
@@ -0,0 +1,131 @@
+import argparse
+import logging
+import numpy as np
+
+import Config
+import Snapshot
+import Layout
+
+# ---------------- Constants ----------------
+SUMMARY_HEADER = ["Type", "Weeks", "Coverage Level", "Coverage Price",
+                  "Total Premium", "Producer Cost", "Net Guarantee/cwt"]
+
+# ---------------- Ladder Arrays ----------------
+def load_ladder(path=None, type_code=None):
+    # The full price ladder from the snapshot as float arrays (dollars, levels as
+    # fractions); missing values become NaN so they drop out of every result
+    header, mm = Snapshot.open_snapshot(path)
+    try:
+        records = np.frombuffer(
+            mm, dtype=np.dtype(Snapshot.NUMPY_DTYPE), count=header["count"], offset=Snapshot.HEADER.size
+        )
+        if type_code is not None:
+            records = records[records["type"] == type_code]
+
+        def dollars(field):
+            raw = records[field].astype(np.float64)
+            raw[records[field] == Snapshot.MISSING_CENTS] = np.nan
+            return raw / 100
+
+        level = records["coverage_level_bp"].astype(np.float64)
+        level[records["coverage_level_bp"] == Snapshot.MISSING_LEVEL] = np.nan
+
+        ladder = {
+            "state": records["state"].astype(np.int64),
+            "type": records["type"].astype(np.int64),
+            "weeks": records["weeks"].astype(np.int64),
+            "coverage_level": level / 10000,
+            "coverage_price": dollars("coverage_price_cents"),
+            "cost_per_cwt": dollars("cost_per_cwt_cents"),
+            "producer_premium": dollars("producer_premium_cents"),
+        }
+    finally:
+        del records
+        mm.close()
+    return ladder
+
+# ---------------- Calculator ----------------
+def calculate(ladder, headcount, weight, share=1.0):
+    # headcount, weight (lb per head) and share broadcast against each other, so
+    # S scenarios give (S, N) results over the N ladder rows in one pass
+    headcount = np.atleast_1d(np.asarray(headcount, dtype=np.float64))[:, None]
+    cwt = np.atleast_1d(np.asarray(weight, dtype=np.float64))[:, None] / 100
+    share = np.atleast_1d(np.asarray(share, dtype=np.float64))[:, None]
+
+    insured_cwt = headcount * cwt * share
+    # Both per-cwt figures come from the report itself, so the subsidy is
+    # whatever RMA applied and the result matches the sheet
+    total_premium = insured_cwt * ladder["cost_per_cwt"]
+    producer_cost = insured_cwt * ladder["producer_premium"]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        net_guarantee = ladder["coverage_price"] - producer_cost / insured_cwt
+
+    return {
+        "insured_value": insured_cwt * ladder["coverage_price"],
+        "total_premium": total_premium,
+        "producer_cost": producer_cost,
+        "net_guarantee": net_guarantee,
+    }
+
+# ---------------- Summary Block ----------------
+def summary_rows(ladder, herds=None):
+    # One row per configured herd and endorsement length, at the ladder row
+    # closest to the herd's coverage level
+    herds = Config.HERDS if herds is None else herds
+    by_name = {r["name"]: r for r in Config.REPORTS}
+    rows = [SUMMARY_HEADER]
+
+    for name, herd in herds.items():
+        report = by_name[name]
+        state_code = Snapshot.code(report.get("state", Config.STATE_VALUE))
+        mask = (ladder["type"] == Snapshot.code(report["type"])) & (ladder["state"] == state_code)
+        if not mask.any():
+            continue
+
+        sub = {k: v[mask] for k, v in ladder.items()}
+        result = calculate(sub, herd["headcount"], herd["weight"], herd.get("share", 1.0))
+        distance = np.abs(np.nan_to_num(sub["coverage_level"], nan=np.inf) - herd.get("coverage", 1.0))
+
+        for weeks in Layout.report_weeks(report):
+            candidates = np.flatnonzero(sub["weeks"] == weeks)
+            if not len(candidates):
+                continue
+            i = candidates[np.argmin(distance[candidates])]
+            rows.append([
+                name,
+                int(weeks),
+                f"{sub['coverage_level'][i]:.2%}",
+                f"${sub['coverage_price'][i]:.2f}",
+                f"${result['total_premium'][0, i]:,.2f}",
+                f"${result['producer_cost'][0, i]:,.2f}",
+                f"${result['net_guarantee'][0, i]:.2f}",
+            ])
+
+    return rows
+
+# ---------------- Run ----------------
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    # python Calculator.py --type 809 --head 100 --weight 750 [--share 1.0]
+    # python Calculator.py            (summary for Config.HERDS)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--type", type=int)
+    parser.add_argument("--head", type=float, nargs="+")
+    parser.add_argument("--weight", type=float, nargs="+")
+    parser.add_argument("--share", type=float, nargs="+", default=[1.0])
+    args = parser.parse_args()
+
+    ladder = load_ladder(type_code=args.type)
+    if args.head and args.weight:
+        result = calculate(ladder, args.head, args.weight, args.share)
+        for i in np.argsort(ladder["weeks"] * 10 - np.nan_to_num(ladder["coverage_level"]), kind="stable"):
+            print(f"{ladder['weeks'][i]:>3}w  {ladder['coverage_level'][i]:7.2%}  "
+                  f"price ${ladder['coverage_price'][i]:8.2f}  "
+                  f"premium ${result['total_premium'][0, i]:10,.2f}  "
+                  f"cost ${result['producer_cost'][0, i]:10,.2f}  "
+                  f"net ${result['net_guarantee'][0, i]:8.2f}")
+    else:
+        for row in summary_rows(ladder):
+            print("\t".join(str(c) for c in row))
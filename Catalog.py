@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import time
+import logging
+
+import LRP
+
+# ---------------- Constants ----------------
+CATALOG_FILE = "catalog.json"
+CATALOG_TTL = 7 * 24 * 60 * 60  # seconds
+
+# Memoized option lists, keyed by wizard level plus the selections above it
+_catalog = None
+
+# ---------------- Cache ----------------
+def catalog_key(level, *parents):
+    return "/".join([level] + list(parents))
+
+def load_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = {}
+        if os.path.exists(CATALOG_FILE):
+            try:
+                with open(CATALOG_FILE) as f:
+                    _catalog = json.load(f)
+            except ValueError:
+                logging.warning(f"Ignoring unreadable {CATALOG_FILE}")
+    return _catalog
+
+def save_catalog():
+    tmp = f"{CATALOG_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(load_catalog(), f, indent=2, sort_keys=True)
+    os.replace(tmp, CATALOG_FILE)
+
+def cached_options(level, *parents):
+    entry = load_catalog().get(catalog_key(level, *parents))
+    if not entry or time.time() - entry["fetched"] > CATALOG_TTL:
+        return None
+    return entry["options"]
+
+def remember(soup, level, *parents):
+    # Record the dropdown on a page the wizard already loaded, at no extra request cost
+    options = LRP.get_options(soup, level)
+    load_catalog()[catalog_key(level, *parents)] = {"fetched": time.time(), "options": options}
+    save_catalog()
+    return options
+
+def check(soup, level, value):
+    values = [v for v, _ in LRP.get_options(soup, level)]
+    if value not in values:
+        raise Exception(f"{level} '{value}' is not offered by RMA; available: {values}")
+
+# ---------------- Discovery ----------------
+def discover(state_value=None, commodity_value=None, session=None):
+    # Walk the wizard just far enough to see the requested level
+    session = session or LRP.new_session()
+
+    soup = LRP.load_page(session)
+    effective_date = LRP.get_first_option_value(soup, "EffectiveDate")
+    soup = LRP.submit(session, soup, "EffectiveDate", effective_date)
+    remember(soup, "StateSelection")
+
+    if state_value:
+        check(soup, "StateSelection", state_value)
+        soup = LRP.submit(session, soup, "StateSelection", state_value)
+        remember(soup, "CommoditySelection", state_value)
+
+        if commodity_value:
+            check(soup, "CommoditySelection", commodity_value)
+            soup = LRP.submit(session, soup, "CommoditySelection", commodity_value)
+            remember(soup, "TypeSelection", state_value, commodity_value)
+
+def get_options(level, state_value=None, commodity_value=None, session=None):
+    parents = [p for p in (state_value, commodity_value) if p]
+    options = cached_options(level, *parents)
+    if options is None:
+        discover(state_value, commodity_value, session)
+        options = cached_options(level, *parents)
+    return options or []
+
+# ---------------- Lookup ----------------
+def lookup(level, code, state_value=None, commodity_value=None):
+    # Accepts either the bare code ("38") or the full option value ("38|North Dakota")
+    for value, label in get_options(level, state_value, commodity_value):
+        if value == code or value.split("|")[0] == code:
+            return value
+    return None
+
+def validate_selection(state_value, commodity_value, type_value):
+    # Cache-only check: a missing or stale level is refreshed by the next wizard walk
+    levels = [
+        ("StateSelection", state_value, []),
+        ("CommoditySelection", commodity_value, [state_value]),
+        ("TypeSelection", type_value, [state_value, commodity_value]),
+    ]
+
+    for level, value, parents in levels:
+        options = cached_options(level, *parents)
+        if options is None:
+            continue
+
+        values = [v for v, _ in options]
+        if value not in values:
+            raise Exception(f"{level} '{value}' not in cached RMA catalog; available: {values}")
+
+# ---------------- Run ----------------
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    # python Catalog.py [STATE [COMMODITY]]  e.g.  python Catalog.py 38 0801
+    args = sys.argv[1:]
+    state_value = lookup("StateSelection", args[0]) if len(args) > 0 else None
+    commodity_value = lookup("CommoditySelection", args[1], state_value) if len(args) > 1 else None
+
+    if len(args) > 0 and not state_value:
+        raise Exception(f"Unknown state code {args[0]}")
+    if len(args) > 1 and not commodity_value:
+        raise Exception(f"Unknown commodity code {args[1]}")
+
+    if commodity_value:
+        level = "TypeSelection"
+    elif state_value:
+        level = "CommoditySelection"
+    else:
+        level = "StateSelection"
+
+    for value, label in get_options(level, state_value, commodity_value):
+        print(f"{value}\t{label}")
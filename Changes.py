@@ -0,0 +1,186 @@
+import json
+import logging
+from datetime import datetime
+
+import Config
+import Store
+import Ladder
+import Snapshot
+
+# ---------------- Constants ----------------
+CHANGES_FILE = "changes.jsonl"
+FIELDS = ["coverage_price", "cost_per_cwt", "producer_premium"]
+
+# "latest" is the previous snapshot per (report, weeks, coverage level);
+# "change_stats" the running aggregates, touched only for keys that moved
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS latest (
+    state TEXT NOT NULL, commodity TEXT NOT NULL, type TEXT NOT NULL,
+    weeks INTEGER NOT NULL, level_bp INTEGER NOT NULL,
+    effective_date TEXT NOT NULL,
+    coverage_price INTEGER, cost_per_cwt INTEGER, producer_premium INTEGER,
+    PRIMARY KEY (state, commodity, type, weeks, level_bp)
+);
+CREATE TABLE IF NOT EXISTS change_stats (
+    state TEXT NOT NULL, commodity TEXT NOT NULL, type TEXT NOT NULL,
+    weeks INTEGER NOT NULL, level_bp INTEGER NOT NULL, field TEXT NOT NULL,
+    moves INTEGER NOT NULL, total_abs_cents INTEGER NOT NULL, max_abs_cents INTEGER NOT NULL,
+    last_change TEXT NOT NULL,
+    PRIMARY KEY (state, commodity, type, weeks, level_bp, field)
+);
+"""
+
+# ---------------- Diff ----------------
+def row_key(row):
+    level = row["coverage_level"]
+    return row["weeks"], Snapshot.MISSING_LEVEL if level is None else round(level * 10000)
+
+def previous_ladder(previous):
+    # The stored rows as a ladder, so a level that drifted since can be matched
+    # to its nearest predecessor
+    return Ladder.build_ladder([
+        dict(r, coverage_level=None if r["level_bp"] == Snapshot.MISSING_LEVEL else r["level_bp"] / 10000)
+        for r in previous.values()
+    ])
+
+def diff_report(conn, result, effective_date):
+    report = (result["state"], result["commodity"], result["type"])
+    previous = {
+        (r["weeks"], r["level_bp"]): r
+        for r in conn.execute(
+            "SELECT * FROM latest WHERE state=? AND commodity=? AND type=?", report
+        )
+    }
+
+    rows = {}
+    for row in result["rows"]:
+        rows.setdefault(row_key(row), row)
+
+    # Exact levels first, then each remaining row to the nearest unclaimed
+    # previous level for its length. RMA's levels move by a few hundredths of a
+    # point day to day; within CHANGE_LEVEL_TOLERANCE that is the same row.
+    matched = {key: key for key in rows if key in previous}
+    ladder = previous_ladder(previous)
+    claimed = set(matched)
+    for key, row in rows.items():
+        if key in matched or row["coverage_level"] is None:
+            continue
+        near = Ladder.nearest(ladder, key[0], row["coverage_level"])
+        if near is None or abs(near["coverage_level"] - row["coverage_level"]) > Config.CHANGE_LEVEL_TOLERANCE:
+            continue
+        old_key = (near["weeks"], near["level_bp"])
+        if old_key not in claimed:
+            matched[key] = old_key
+            claimed.add(old_key)
+
+    changes = []
+    upserts = []
+    for key, row in rows.items():
+        new = {f: Snapshot.cents(row[f]) for f in FIELDS}
+        old = previous.get(matched.get(key))
+        if old is None:
+            upserts.append(report + key + (effective_date,) + tuple(new[f] for f in FIELDS))
+            if previous:
+                changes.append({"key": key, "kind": "added"})
+            continue
+
+        moved = [f for f in FIELDS if old[f] != new[f]]
+        if moved or matched[key] != key:
+            upserts.append(report + key + (effective_date,) + tuple(new[f] for f in FIELDS))
+        for f in moved:
+            changes.append({"key": key, "kind": "moved", "field": f, "old": old[f], "new": new[f]})
+
+    # Drifted levels are re-keyed: their old key goes, without a "removed" change
+    removed = [key for key in previous if key not in claimed]
+    for key in removed:
+        changes.append({"key": key, "kind": "removed"})
+    stale = removed + [old for key, old in matched.items() if old != key]
+
+    return report, changes, upserts, stale
+
+def threshold_hit(change):
+    if change["kind"] != "moved" or Snapshot.MISSING_CENTS in (change["old"], change["new"]):
+        return False
+    move = abs(change["new"] - change["old"])
+    if move >= Config.CHANGE_ALERT_CENTS:
+        return True
+    return change["old"] != 0 and move / abs(change["old"]) >= Config.CHANGE_ALERT_PCT
+
+# ---------------- Detect ----------------
+def detect(results, conn):
+    # Compares each new report with the previous snapshot held in "latest".
+    # Nothing is written here; pass the result to commit() once the run's
+    # reports have been delivered, so a failed run sees the same moves on retry.
+    # Work is one indexed read per report; history in "rows" is never scanned.
+    conn.executescript(SCHEMA)
+    pending = {
+        "delta": {"run": datetime.now().isoformat(timespec="seconds"), "reports": {}},
+        "alerts": [],
+        "writes": [],
+    }
+
+    for name, result in results.items():
+        effective_date = Store.iso_date(result["effective_date"])
+        report, changes, upserts, stale = diff_report(conn, result, effective_date)
+        pending["writes"].append((report, changes, upserts, stale, effective_date))
+
+        pending["alerts"].extend((name, effective_date, c) for c in changes if threshold_hit(c))
+        if changes:
+            # Compact: [weeks, level_bp, kind, field, old, new]
+            pending["delta"]["reports"][name] = {
+                "effective_date": effective_date,
+                "changes": [
+                    [c["key"][0], c["key"][1], c["kind"], c.get("field"), c.get("old"), c.get("new")]
+                    for c in changes
+                ],
+            }
+
+    return pending
+
+def commit(pending, conn):
+    # Moves "latest" forward, rolls the moves into change_stats (touching only
+    # keys that changed) and records the delta; returns the flagged alerts
+    conn.executescript(SCHEMA)
+    with conn:
+        for report, changes, upserts, stale, effective_date in pending["writes"]:
+            conn.executemany(
+                "DELETE FROM latest WHERE state=? AND commodity=? AND type=? AND weeks=? AND level_bp=?",
+                [report + key for key in stale]
+            )
+            conn.executemany("INSERT OR REPLACE INTO latest VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", upserts)
+
+            for change in changes:
+                if change["kind"] != "moved" or Snapshot.MISSING_CENTS in (change["old"], change["new"]):
+                    continue
+                move = abs(change["new"] - change["old"])
+                conn.execute("""
+                    INSERT INTO change_stats VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?)
+                    ON CONFLICT (state, commodity, type, weeks, level_bp, field) DO UPDATE SET
+                        moves = moves + 1,
+                        total_abs_cents = total_abs_cents + excluded.total_abs_cents,
+                        max_abs_cents = MAX(max_abs_cents, excluded.max_abs_cents),
+                        last_change = excluded.last_change
+                """, report + change["key"] + (change["field"], move, move, effective_date))
+
+    if pending["delta"]["reports"]:
+        with open(CHANGES_FILE, "a") as f:
+            f.write(json.dumps(pending["delta"], separators=(",", ":")) + "\n")
+
+    for name, effective_date, change in pending["alerts"]:
+        logging.warning(
+            f"{name} {change['key'][0]}w @ {change['key'][1] / 100:.2f}%: {change['field']} "
+            f"{change['old'] / 100:.2f} -> {change['new'] / 100:.2f} on {effective_date}"
+        )
+
+    return pending["alerts"]
+
+# ---------------- Sheet Block ----------------
+def alert_rows(alerts):
+    rows = [["Type", "Weeks", "Coverage Level", "Field", "Previous", "Current", "Change"]]
+    for name, effective_date, change in alerts:
+        old, new = change["old"] / 100, change["new"] / 100
+        rows.append([
+            name, change["key"][0], f"{change['key'][1] / 100:.2f}%", change["field"],
+            f"{old:.2f}", f"{new:.2f}", f"{new - old:+.2f}",
+        ])
+    return rows
@@ -0,0 +1,67 @@
+import re
+import zlib
+
+# ---------------- Constants ----------------
+# Named columns and the header words that identify them. A header cell matches
+# a name when it contains every word of one of its phrases.
+COLUMN_NAMES = {
+    "weeks": ["endorsement length", "length weeks", "weeks"],
+    "coverage_price": ["coverage price"],
+    "coverage_level": ["coverage level", "coverage percent"],
+    "expected_ending_value": ["expected ending value", "expected end value"],
+    "rate": ["rate"],
+    "cost_per_cwt": ["cost per cwt", "cost cwt"],
+    "producer_premium": ["producer premium"],
+    "end_date": ["end date"],
+}
+
+# Without these the sheet blocks can't be filled
+REQUIRED = ["weeks", "coverage_price", "cost_per_cwt", "producer_premium"]
+
+# Resolved index maps by header fingerprint; None marks a row that isn't a report header
+_layouts = {}
+
+# ---------------- Header Resolution ----------------
+def header_words(text):
+    return set(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+def header_texts(row):
+    # Expand colspans so positions line up with the data cells
+    texts = []
+    for cell in row.find_all(["th", "td"]):
+        texts.extend([cell.get_text(" ", strip=True)] * int(cell.get("colspan", 1) or 1))
+    return texts
+
+def layout_fingerprint(texts):
+    return f"{len(texts)}-{zlib.crc32('|'.join(texts).lower().encode('utf-8')):08x}"
+
+def resolve(texts):
+    words = [header_words(t) for t in texts]
+    index = {}
+    for name, phrases in COLUMN_NAMES.items():
+        for i, cell in enumerate(words):
+            if i in index.values():
+                continue
+            if any(header_words(p) <= cell for p in phrases):
+                index[name] = i
+                break
+    return index
+
+def column_map(row):
+    # Returns {name: position} for a recognised header row, or None
+    texts = header_texts(row)
+    key = layout_fingerprint(texts)
+
+    if key not in _layouts:
+        index = resolve(texts)
+        missing = [name for name in REQUIRED if name not in index]
+
+        if not missing:
+            _layouts[key] = index
+        elif row.find("th") and len(missing) < len(REQUIRED):
+            # Looks like the report header but a column we rely on is gone
+            raise Exception(f"Unknown report layout {key}: missing {missing} in {texts}")
+        else:
+            _layouts[key] = None
+
+    return _layouts[key]
@@ -0,0 +1,77 @@
+# ---------------- Spreadsheet ----------------
+SPREADSHEET_ID = "1eFn_RVcCw3MmdLRGASrYwoCbc1UPfFNVqq1Fbz2mvYg"
+SHEET_NAME = "Sheet1"
+
+# Every target receives the same scrape. A target may set "sheet",
+# "start_row", "start_col", "block_gap", a "reports" subset, and "ranges"
+# pinning individual reports to explicit A1 ranges.
+TARGETS = [
+    {"spreadsheet_id": SPREADSHEET_ID},
+]
+
+# ---------------- Report Matrix ----------------
+STATE_VALUE = "38|North Dakota"
+COMMODITY_VALUE = "0801|Feeder Cattle"
+
+TARGET_VALUES = [13, 17, 21, 26, 30, 34, 39, 43, 47]
+
+# Coverage level written for each week, e.g. 1.0 for the row closest to 100%.
+# None keeps the first row the report lists. A report may override "coverage".
+COVERAGE_TARGET = None
+
+# Blocks are stacked top to bottom in this order. A report may override
+# "state", "commodity" or "weeks", and "gap" sets the blank rows above it.
+REPORTS = [
+    {"name": "Unborn", "type": "817|Unborn Bulls & Heifers"},
+    {"name": "Steers1", "type": "809|Steers Weight 1"},
+    {"name": "Steers2", "type": "810|Steers Weight 2"},
+    {"name": "Heifers1", "type": "811|Heifers Weight 1", "gap": 4},
+    {"name": "Heifers2", "type": "812|Heifers Weight 2"},
+]
+
+# ---------------- Output Sinks ----------------
+# A report goes to the sinks named in its "sinks" (default DEFAULT_SINKS). Every
+# sink may also set "batch", "interval" (seconds) and "queue" (max records), and
+# "flush": "close" to hold everything for one delivery at the end of the run.
+# Sheets sinks do that by default; the others flush every "interval".
+SINKS = {
+    "sheets": {"kind": "sheets"},
+    # "csv": {"kind": "csv", "path": "lrp.csv"},
+    # "jsonl": {"kind": "jsonl", "path": "lrp.jsonl"},
+    # "sqlite": {"kind": "sqlite", "path": "export.db"},
+    # "webhook": {"kind": "webhook", "url": "http://127.0.0.1:9000/lrp"},
+}
+DEFAULT_SINKS = ["sheets"]
+
+# ---------------- Sheet Layout ----------------
+START_ROW = 4
+START_COL = "C"
+BLOCK_COLUMNS = 3
+BLOCK_GAP = 2
+
+# ---------------- Calculator ----------------
+# Herds priced against the full ladder after every run, keyed by report name:
+#   "Steers1": {"headcount": 120, "weight": 750, "share": 1.0, "coverage": 1.0}
+# The summary block is written to CALCULATOR_RANGE on the first target, if set.
+HERDS = {}
+CALCULATOR_RANGE = None  # e.g. "Sheet1!I3"
+
+# ---------------- Change Alerts ----------------
+# A move is flagged when it is at least this many cents or this fraction of the
+# previous value. Flagged moves go to the log and, if set, to CHANGES_RANGE.
+# A coverage level within CHANGE_LEVEL_TOLERANCE of yesterday's is the same row.
+CHANGE_ALERT_CENTS = 100
+CHANGE_ALERT_PCT = 0.02
+CHANGE_LEVEL_TOLERANCE = 0.0025
+CHANGES_RANGE = None  # e.g. "Sheet1!Q3:W40"
+
+# ---------------- Rollups ----------------
+# Trailing windows (days) kept in the history store's rollup tables. The trend
+# summary is written to ROLLUP_RANGE on the first target, if set.
+ROLLUP_WINDOWS = [30, 90]
+ROLLUP_RANGE = None  # e.g. "Sheet1!Y3"
+
+# ---------------- Daemon ----------------
+# Local times the daemon refreshes on its own, plus the control socket
+DAEMON_SCHEDULE = ["20:45", "21:00", "21:30"]
+DAEMON_SOCKET = "lrp.sock"
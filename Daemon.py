@@ -0,0 +1,163 @@
+import os
+import json
+import signal
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+from datetime import datetime, timedelta
+
+import Config
+import LRP
+import Run
+import Quota
+
+# ---------------- State ----------------
+# Everything a cron run rebuilds from scratch stays warm here between refreshes
+state = {
+    "session": None,
+    "client": None,
+    "effective_date": None,
+    "values": {},
+    "results": {},
+    "last_run": None,
+    "last_error": None,
+    "runs": 0,
+}
+
+trigger = threading.Event()
+stopping = threading.Event()
+forced = threading.Event()
+
+# ---------------- Schedule ----------------
+def next_scheduled(now=None):
+    now = now or datetime.now()
+    times = []
+    for hhmm in Config.DAEMON_SCHEDULE:
+        hour, minute = map(int, hhmm.split(":"))
+        at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        times.append(at if at > now else at + timedelta(days=1))
+    return min(times)
+
+# ---------------- Refresh ----------------
+def refresh(force=False):
+    if state["session"] is None:
+        state["session"] = LRP.new_session()
+
+    # One request tells us whether RMA has published anything new
+    effective_date = LRP.latest_effective_date(state["session"])
+    if not force and effective_date == state["effective_date"]:
+        logging.info(f"Effective date still {effective_date} — nothing to fetch")
+        return
+
+    if state["client"] is None:
+        state["client"] = Quota.connect()
+
+    values, results = Run.run(session=state["session"], client=state["client"])
+    state["values"].update(values)
+    state["results"].update(results)
+    state["effective_date"] = effective_date
+    state["runs"] += 1
+
+def status():
+    return {
+        "effective_date": state["effective_date"],
+        "last_run": state["last_run"],
+        "last_error": state["last_error"],
+        "runs": state["runs"],
+        "values": state["values"],
+    }
+
+# ---------------- Control Socket ----------------
+class ControlHandler(socketserver.StreamRequestHandler):
+    # One command per connection: "run", "force", "status" or "stop"
+    def handle(self):
+        command = self.rfile.readline().decode("utf-8").strip()
+
+        if command in ("run", "force"):
+            if command == "force":
+                forced.set()
+            trigger.set()
+            reply = {"ok": True, "queued": command}
+        elif command == "status":
+            reply = status()
+        elif command == "stop":
+            stopping.set()
+            trigger.set()
+            reply = {"ok": True}
+        else:
+            reply = {"ok": False, "error": f"unknown command {command!r}"}
+
+        self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+
+def start_control_socket(path):
+    if os.path.exists(path):
+        os.remove(path)
+    server = socketserver.ThreadingUnixStreamServer(path, ControlHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def send_command(command, path=None):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path or Config.DAEMON_SOCKET)
+        sock.sendall((command + "\n").encode("utf-8"))
+        return sock.makefile().readline().strip()
+
+# ---------------- Main Loop ----------------
+def serve(socket_path=None, run_now=False):
+    socket_path = socket_path or Config.DAEMON_SOCKET
+    server = start_control_socket(socket_path)
+
+    # kill -USR1 <pid> refreshes now, TERM/INT stop after the current refresh
+    signal.signal(signal.SIGUSR1, lambda *_: trigger.set())
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: (stopping.set(), trigger.set()))
+
+    logging.info(f"Daemon listening on {socket_path}, pid {os.getpid()}")
+    if run_now:
+        trigger.set()
+
+    try:
+        while not stopping.is_set():
+            at = next_scheduled()
+            logging.info(f"Next scheduled refresh at {at:%Y-%m-%d %H:%M}")
+            trigger.wait(max(0.0, (at - datetime.now()).total_seconds()))
+            trigger.clear()
+            if stopping.is_set():
+                break
+
+            force = forced.is_set()
+            forced.clear()
+            try:
+                refresh(force)
+                state["last_error"] = None
+            except Exception as e:
+                # Keep serving; the next trigger starts from a fresh RMA session
+                logging.exception("Refresh failed")
+                state["last_error"] = str(e)
+                state["session"] = None
+            state["last_run"] = datetime.now().isoformat(timespec="seconds")
+    finally:
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+# ---------------- Run ----------------
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    # python Daemon.py [--now]             start the daemon
+    # python Daemon.py --send run|force|status|stop
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--now", action="store_true", help="refresh once at startup")
+    parser.add_argument("--socket", default=Config.DAEMON_SOCKET)
+    parser.add_argument("--send", metavar="COMMAND")
+    args = parser.parse_args()
+
+    if args.send:
+        print(send_command(args.send, args.socket))
+    else:
+        serve(args.socket, run_now=args.now)
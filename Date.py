@@ -1,76 +1,44 @@
-import os
-import base64
 import logging
 from datetime import datetime
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 
-logging.basicConfig(level=logging.INFO)
-
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
-SPREADSHEET_ID = "1eFn_RVcCw3MmdLRGASrYwoCbc1UPfFNVqq1Fbz2mvYg"
-SHEET_NAME = "Sheet1"
-
-# ---------------- Google Auth ----------------
-CREDENTIALS_B64 = os.getenv("GOOGLE_OAUTH_CREDENTIALS_B64")
-if not CREDENTIALS_B64:
-    raise Exception("Missing GOOGLE_OAUTH_CREDENTIALS_B64 environment variable")
-
-with open("credentials.json", "w") as f:
-    f.write(base64.b64decode(CREDENTIALS_B64).decode("utf-8"))
+import Config
+import LRP
+import Quota
+import Layout
 
-def get_sheets_service():
-    creds = None
-
-    if os.path.exists("token.json"):
-        creds = Credentials.from_authorized_user_file("token.json", SCOPES)
-
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            flow = InstalledAppFlow.from_client_secrets_file(
-                "credentials.json", SCOPES
-            )
-            creds = flow.run_local_server(port=0)
-
-        with open("token.json", "w") as token:
-            token.write(creds.to_json())
+logging.basicConfig(level=logging.INFO)
 
-    return build("sheets", "v4", credentials=creds)
+TIMESTAMP_CELL = "D1"
 
 # ---------------- Update Timestamp Logic ----------------
-def update_timestamp_if_data_exists():
-    service = get_sheets_service()
+def data_range(target):
+    # From the first block to the last, out to two columns past the block
+    # width (C:G on the default layout)
+    blocks = Layout.compute_blocks(target=target)
+    first_col = min((b["first_col"] for b in blocks), key=Layout.col_index)
+    last_col = Layout.col_letter(Layout.col_index(first_col) + Config.BLOCK_COLUMNS + 1)
+    return Layout.extent_range(blocks, last_col=last_col)
 
-    # Range that contains report data
-    data_range = f"{SHEET_NAME}!C4:G58"
-    result = service.spreadsheets().values().get(
-        spreadsheetId=SPREADSHEET_ID,
-        range=data_range
-    ).execute()
-
-    data = result.get("values", [])
+def update_timestamp_if_data_exists():
+    client = Quota.SheetsClient(LRP.get_sheets_service())
+    now = datetime.now().strftime("%m-%d-%Y")
 
-    # Check if ANY cell has data
-    changes_detected = any(any(cell.strip() for cell in row) for row in data)
+    for target in Config.TARGETS:
+        spreadsheet_id = target["spreadsheet_id"]
+        sheet_name = target.get("sheet", Config.SHEET_NAME)
+        data = client.get(spreadsheet_id, data_range(target)).get("values", [])
 
-    if changes_detected:
-        now = datetime.now().strftime("%m-%d-%Y")
-        timestamp_range = f"{SHEET_NAME}!D1"
+        # Check if ANY cell has data
+        changes_detected = any(any(cell.strip() for cell in row) for row in data)
 
-        service.spreadsheets().values().update(
-            spreadsheetId=SPREADSHEET_ID,
-            range=timestamp_range,
-            valueInputOption="RAW",
-            body={"values": [[now]]}
-        ).execute()
+        if changes_detected:
+            client.update(spreadsheet_id, f"{sheet_name}!{TIMESTAMP_CELL}", [[now]])
+            logging.info(f"Timestamp updated in {spreadsheet_id} {sheet_name}!{TIMESTAMP_CELL}: {now}")
+        else:
+            logging.info(f"No data detected in {spreadsheet_id} — timestamp not updated")
 
-        logging.info(f"Timestamp updated in D1: {now}")
-    else:
-        logging.info("No data detected — timestamp not updated")
+    client.flush()
+    client.log_usage()
 
 # ---------------- Run ----------------
 update_timestamp_if_data_exists()
@@ -0,0 +1,52 @@
+import os
+import re
+import json
+import zlib
+
+# ---------------- Constants ----------------
+FINGERPRINT_FILE = "fingerprints.json"
+
+TABLE_START = re.compile(r"<table\b", re.I)
+TABLE_END = re.compile(r"</table\s*>", re.I)
+# ViewState and friends change on every response even when the report doesn't
+HIDDEN_INPUT = re.compile(r"<input\b[^>]*type=[\"']?hidden[^>]*>", re.I)
+
+# ---------------- Hashing ----------------
+def table_region(html):
+    start = TABLE_START.search(html)
+    if not start:
+        return HIDDEN_INPUT.sub("", html)
+
+    end = None
+    for end in TABLE_END.finditer(html, start.start()):
+        pass
+    return HIDDEN_INPUT.sub("", html[start.start():end.end() if end else len(html)])
+
+def fingerprint(html):
+    # crc32 and adler32 side by side plus the length: cheap, and two independent
+    # 32-bit checks make an accidental match across runs practically impossible
+    data = table_region(html).encode("utf-8")
+    return f"{len(data):x}-{zlib.crc32(data):08x}{zlib.adler32(data):08x}"
+
+# ---------------- State ----------------
+def load_fingerprints():
+    if not os.path.exists(FINGERPRINT_FILE):
+        return {}
+    with open(FINGERPRINT_FILE) as f:
+        return json.load(f)
+
+def save_fingerprints(fingerprints):
+    tmp = f"{FINGERPRINT_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+    os.replace(tmp, FINGERPRINT_FILE)
+
+def report_key(state_value, commodity_value, type_value, weeks=None, coverage=None):
+    # The weeks and coverage level written are part of the key, so changing a
+    # report's output config forces a fresh parse even if the page is the same
+    key = "/".join([state_value, commodity_value, type_value])
+    if weeks is not None:
+        key += "@" + ",".join(str(week) for week in weeks)
+    if coverage is not None:
+        key += f"~{coverage:g}"
+    return key
@@ -0,0 +1,211 @@
+import requests
+from bs4 import BeautifulSoup
+import re
+import os
+import base64
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+from google.auth.transport.requests import Request
+from googleapiclient.discovery import build
+
+import Ladder
+import Columns
+import Profile
+
+# ---------------- Constants ----------------
+URL = "https://public.rma.usda.gov/livestockreports/LRPReport"
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+# ---------------- Google Auth ----------------
+def write_credentials():
+    credentials_b64 = os.getenv("GOOGLE_OAUTH_CREDENTIALS_B64")
+    if not credentials_b64:
+        raise Exception("Missing GOOGLE_OAUTH_CREDENTIALS_B64 environment variable")
+
+    with open("credentials.json", "w") as f:
+        f.write(base64.b64decode(credentials_b64).decode("utf-8"))
+
+def get_credentials():
+    write_credentials()
+
+    creds = None
+    if os.path.exists("token.json"):
+        creds = Credentials.from_authorized_user_file("token.json", SCOPES)
+
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(
+                "credentials.json", SCOPES
+            )
+            creds = flow.run_local_server(port=0)
+
+        with open("token.json", "w") as token:
+            token.write(creds.to_json())
+
+    return creds
+
+def get_sheets_service(creds=None):
+    return build("sheets", "v4", credentials=creds or get_credentials())
+
+# ---------------- Helpers ----------------
+def extract_hidden_fields(soup):
+    data = {}
+    for tag in soup.select("input[type=hidden]"):
+        if tag.get("name"):
+            data[tag["name"]] = tag.get("value", "")
+    return data
+
+def find_select(soup, select_id):
+    return soup.find("select", {"id": select_id}) or soup.find("select", {"name": select_id})
+
+def get_options(soup, select_id):
+    select = find_select(soup, select_id)
+    if not select:
+        raise Exception(f"Dropdown {select_id} not found")
+
+    options = []
+    for option in select.find_all("option"):
+        value = option.get("value", "")
+        if value:
+            options.append([value, option.get_text(strip=True)])
+    return options
+
+def get_first_option_value(soup, select_id):
+    select = find_select(soup, select_id)
+    if not select:
+        raise Exception(f"Dropdown {select_id} not found")
+    option = select.find("option")
+    return option.get("value", "")
+
+def price(col):
+    txt = col.get_text(strip=True)
+    m = re.search(r"\$\d+(?:\.\d{2})?", txt)
+    return m.group() if m else "N/A"
+
+# ---------------- Wizard ----------------
+def new_session():
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0",
+        "Referer": URL
+    })
+    return session
+
+def load_page(session):
+    resp = session.get(URL)
+    resp.raise_for_status()
+    return BeautifulSoup(resp.text, "html.parser")
+
+def post(session, soup, field, value, button="Next >>"):
+    form_data = extract_hidden_fields(soup)
+    form_data[field] = value
+    form_data["buttonType"] = button
+
+    resp = session.post(URL, data=form_data)
+    resp.raise_for_status()
+    return resp.text
+
+def submit(session, soup, field, value, button="Next >>"):
+    return BeautifulSoup(post(session, soup, field, value, button), "html.parser")
+
+def latest_effective_date(session):
+    return get_first_option_value(load_page(session), "EffectiveDate")
+
+def fetch_report(session, state_value, commodity_value, type_value, soup=None):
+    # Imported here so Catalog can reuse the wizard helpers above
+    import Catalog
+
+    # -------- Step 1: Load page --------
+    if soup is None:
+        with Profile.stage("wizard.load"):
+            soup = load_page(session)
+
+    # -------- Step 2: Effective Date (most recent) --------
+    with Profile.stage("wizard.effective_date"):
+        effective_date = get_first_option_value(soup, "EffectiveDate")
+        soup = submit(session, soup, "EffectiveDate", effective_date)
+        Catalog.remember(soup, "StateSelection")
+        Catalog.check(soup, "StateSelection", state_value)
+
+    # -------- Step 3: State --------
+    with Profile.stage("wizard.state"):
+        soup = submit(session, soup, "StateSelection", state_value)
+        Catalog.remember(soup, "CommoditySelection", state_value)
+        Catalog.check(soup, "CommoditySelection", commodity_value)
+
+    # -------- Step 4: Commodity --------
+    with Profile.stage("wizard.commodity"):
+        soup = submit(session, soup, "CommoditySelection", commodity_value)
+        Catalog.remember(soup, "TypeSelection", state_value, commodity_value)
+        Catalog.check(soup, "TypeSelection", type_value)
+
+    # -------- Step 5: Type --------
+    # Raw HTML, so an unchanged report can be recognised before it is parsed
+    with Profile.stage("fetch"):
+        return post(session, soup, "TypeSelection", type_value, button="Create Report")
+
+# ---------------- Parse All Tables ----------------
+def coverage_level(text):
+    # "95.58%" or "0.9558" -> 0.9558
+    m = re.search(r"\d+(?:\.\d+)?", text.replace(",", ""))
+    if not m:
+        return None
+    level = float(m.group())
+    return level / 100 if level > 1.5 else level
+
+def parse_rows(html):
+    # Every coverage-price row of every table, in report order. Columns are found
+    # through each table's header row, so a reshuffled report fails here instead
+    # of landing in the wrong cells.
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    wide_rows = 0
+    resolved = False
+
+    for table in soup.find_all("table"):
+        index = None
+
+        # Only header-looking rows are probed: th cells, or a table's first row
+        for position, row in enumerate(table.find_all("tr")):
+            if row.find("th") or position == 0:
+                found = Columns.column_map(row)
+                if found:
+                    index = found
+                    resolved = True
+                    continue
+
+            cols = row.find_all("td")
+            if len(cols) > len(Columns.REQUIRED):
+                wide_rows += 1
+            if index is None or len(cols) <= max(index.values()):
+                continue
+
+            val = cols[index["weeks"]].get_text(strip=True)
+            if not val.isdigit():
+                continue
+
+            level = cols[index["coverage_level"]].get_text(strip=True) if "coverage_level" in index else ""
+            rows.append({
+                "weeks": int(val),
+                "coverage_level": coverage_level(level),
+                "coverage_price": price(cols[index["coverage_price"]]),
+                "cost_per_cwt": cols[index["cost_per_cwt"]].get_text(strip=True),
+                "producer_premium": cols[index["producer_premium"]].get_text(strip=True),
+            })
+
+    if wide_rows and not resolved:
+        raise Exception("Report tables have data rows but no recognisable header row")
+
+    return rows
+
+def sheet_values(ladder, weeks, level=None):
+    values = []
+    for week in weeks:
+        row = Ladder.pick(ladder, week, level)
+        if row:
+            values.append([row["producer_premium"], row["coverage_price"], row["cost_per_cwt"]])
+        else:
+            values.append(["0", "0", "0"])
+    return values
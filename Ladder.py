@@ -0,0 +1,52 @@
+from bisect import bisect_left, bisect_right
+
+# ---------------- Build ----------------
+def build_ladder(rows):
+    # {weeks: {"levels": [...], "rows": [...], "first": row}} with levels ascending,
+    # so every per-week query below is a binary search over one short list
+    grouped = {}
+    for row in rows:
+        entry = grouped.setdefault(row["weeks"], {"rows": [], "first": row})
+        if row["coverage_level"] is not None:
+            entry["rows"].append(row)
+
+    ladder = {}
+    for weeks, entry in grouped.items():
+        ordered = sorted(entry["rows"], key=lambda r: r["coverage_level"])
+        ladder[weeks] = {
+            "levels": [r["coverage_level"] for r in ordered],
+            "rows": ordered,
+            "first": entry["first"],
+        }
+    return ladder
+
+# ---------------- Queries ----------------
+def first(ladder, weeks):
+    # The row the report lists first for this endorsement length
+    entry = ladder.get(weeks)
+    return entry["first"] if entry else None
+
+def nearest(ladder, weeks, level):
+    entry = ladder.get(weeks)
+    if not entry or not entry["levels"]:
+        return None
+
+    levels = entry["levels"]
+    i = bisect_left(levels, level)
+    if i == len(levels):
+        return entry["rows"][-1]
+    if i and level - levels[i - 1] <= levels[i] - level:
+        return entry["rows"][i - 1]
+    return entry["rows"][i]
+
+def between(ladder, weeks, low, high):
+    entry = ladder.get(weeks)
+    if not entry:
+        return []
+
+    levels = entry["levels"]
+    return entry["rows"][bisect_left(levels, low):bisect_right(levels, high)]
+
+def pick(ladder, weeks, level=None):
+    # None keeps the report's own first row, otherwise the closest coverage level
+    return first(ladder, weeks) if level is None else nearest(ladder, weeks, level)
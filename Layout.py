@@ -0,0 +1,200 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+
+import Config
+
+# ---------------- Constants ----------------
+LAYOUT_FILE = "layout.json"
+
+# layout.json holds every target; fan-out threads save through this lock
+_layout_lock = threading.Lock()
+
+# ---------------- Columns ----------------
+def col_index(letters):
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + ord(ch) - ord("A") + 1
+    return index
+
+def col_letter(index):
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+# ---------------- Blocks ----------------
+def report_weeks(report):
+    return report.get("weeks", Config.TARGET_VALUES)
+
+def parse_range(a1):
+    # "Sheet1!C15:E23" -> ("Sheet1", "C", 15, "E", 23)
+    sheet_name, cells = a1.split("!")
+    m = re.fullmatch(r"([A-Z]+)(\d+):([A-Z]+)(\d+)", cells.upper())
+    if not m:
+        raise Exception(f"Unsupported range {a1}")
+    return sheet_name, m.group(1), int(m.group(2)), m.group(3), int(m.group(4))
+
+def make_block(name, sheet_name, first_col, first_row, last_col, last_row):
+    return {
+        "name": name,
+        "sheet": sheet_name,
+        "first_col": first_col,
+        "last_col": last_col,
+        "first_row": first_row,
+        "last_row": last_row,
+        "range": f"{sheet_name}!{first_col}{first_row}:{last_col}{last_row}",
+    }
+
+def compute_blocks(reports=None, target=None):
+    # A target may override the sheet, START_ROW, START_COL and BLOCK_GAP, pick
+    # which reports it receives ("reports"), and pin any block to an explicit
+    # A1 range ("ranges"); pinned blocks don't move the stacked ones.
+    target = target or {}
+    reports = Config.REPORTS if reports is None else reports
+    if "reports" in target:
+        by_name = {r["name"]: r for r in reports}
+        reports = [by_name[name] for name in target["reports"]]
+
+    sheet_name = target.get("sheet", Config.SHEET_NAME)
+    first_col = target.get("start_col", Config.START_COL)
+    last_col = col_letter(col_index(first_col) + Config.BLOCK_COLUMNS - 1)
+    pinned = target.get("ranges", {})
+
+    blocks = []
+    row = target.get("start_row", Config.START_ROW)
+    stacked = 0
+    for report in reports:
+        if report["name"] in pinned:
+            blocks.append(make_block(report["name"], *parse_range(pinned[report["name"]])))
+            continue
+
+        if stacked:
+            row += report.get("gap", target.get("block_gap", Config.BLOCK_GAP))
+        stacked += 1
+
+        rows = len(report_weeks(report))
+        blocks.append(make_block(report["name"], sheet_name, first_col, row, last_col, row + rows - 1))
+        row += rows
+
+    return blocks
+
+def extent(blocks):
+    return min(b["first_row"] for b in blocks), max(b["last_row"] for b in blocks)
+
+def extent_range(blocks, last_col=None, sheet_name=None):
+    first_row, last_row = extent(blocks)
+    last_col = last_col or max((b["last_col"] for b in blocks), key=col_index)
+    first_col = min((b["first_col"] for b in blocks), key=col_index)
+    return f"{sheet_name or blocks[0]['sheet']}!{first_col}{first_row}:{last_col}{last_row}"
+
+def block_cells(block):
+    # One entry per row, so overlapping blocks and stale rows can be diffed as sets
+    return {
+        (block["sheet"], block["first_col"], block["last_col"], row)
+        for row in range(block["first_row"], block["last_row"] + 1)
+    }
+
+def cell_ranges(cells):
+    # Collapse (sheet, first_col, last_col, row) entries into contiguous A1 ranges
+    ranges = []
+    start = prev = None
+    for cell in sorted(cells) + [None]:
+        if start is not None and (cell is None or cell[:3] != prev[:3] or cell[3] != prev[3] + 1):
+            sheet_name, first_col, last_col, _ = start
+            ranges.append(f"{sheet_name}!{first_col}{start[3]}:{last_col}{prev[3]}")
+            start = None
+        if start is None:
+            start = cell
+        prev = cell
+    return ranges
+
+# ---------------- State ----------------
+def load_layout(spreadsheet_id):
+    if not os.path.exists(LAYOUT_FILE):
+        return {}
+    with open(LAYOUT_FILE) as f:
+        return json.load(f).get(spreadsheet_id, {})
+
+def save_layout(spreadsheet_id, state):
+    with _layout_lock:
+        everything = {}
+        if os.path.exists(LAYOUT_FILE):
+            with open(LAYOUT_FILE) as f:
+                everything = json.load(f)
+        everything[spreadsheet_id] = state
+
+        tmp = f"{LAYOUT_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(everything, f, indent=2, sort_keys=True)
+        os.replace(tmp, LAYOUT_FILE)
+
+def digest(values):
+    return hashlib.sha1(json.dumps(values).encode("utf-8")).hexdigest()
+
+# ---------------- Write Plan ----------------
+def plan_writes(blocks, values_by_name, previous):
+    # Only blocks that moved or whose values changed are written; rows a block
+    # used to occupy and no current block covers any more are cleared.
+    current_cells = set()
+    for block in blocks:
+        current_cells |= block_cells(block)
+
+    names = {block["name"] for block in blocks}
+    data = []
+    state = dict(previous)
+    stale_cells = set()
+
+    for block in blocks:
+        values = values_by_name.get(block["name"])
+        if values is None:
+            continue
+
+        width = col_index(block["last_col"]) - col_index(block["first_col"]) + 1
+        rows = block["last_row"] - block["first_row"] + 1
+        padded = [list(row)[:width] + [""] * (width - len(row)) for row in values[:rows]]
+        padded += [[""] * width] * (rows - len(padded))
+
+        entry = dict(block, digest=digest(padded))
+        del entry["name"]
+
+        old = previous.get(block["name"])
+        if old and old["range"] == entry["range"] and old["digest"] == entry["digest"]:
+            continue
+
+        if old:
+            stale_cells |= block_cells(old)
+        data.append({"range": block["range"], "values": padded})
+        state[block["name"]] = entry
+
+    # Blocks removed from the config
+    for name, old in previous.items():
+        if name not in names:
+            stale_cells |= block_cells(old)
+            del state[name]
+
+    return {
+        "clear": cell_ranges(stale_cells - current_cells),
+        "data": data,
+        "state": state,
+    }
+
+def apply_plan(client, spreadsheet_id, plan):
+    if plan["clear"]:
+        client.clear(spreadsheet_id, plan["clear"])
+        logging.info(f"Clearing {', '.join(plan['clear'])}")
+
+    for d in plan["data"]:
+        client.update(spreadsheet_id, d["range"], d["values"])
+
+    if plan["data"]:
+        logging.info(f"Writing {', '.join(d['range'] for d in plan['data'])}")
+    else:
+        logging.info("No block changed — nothing to write")
+
+    client.flush(spreadsheet_id)
+    save_layout(spreadsheet_id, plan["state"])
@@ -0,0 +1,153 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# ---------------- Constants ----------------
+PROFILE_DIR = "profile"
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples for the flamegraph file
+TOP_ALLOCATORS = 15
+
+# Off unless enable() is called, so stage() costs next to nothing in normal runs
+_state = None
+
+# ---------------- Setup ----------------
+def enable(out_dir=None):
+    global _state
+    out_dir = out_dir or os.path.join(PROFILE_DIR, datetime.now().strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(out_dir, exist_ok=True)
+
+    tracemalloc.start(25)
+    _state = {
+        "dir": out_dir,
+        "stack": [],
+        "profiles": {},
+        "wall": {},
+        "calls": {},
+        "allocations": {},
+        "overhead": 0.0,
+        "busy": False,
+        "samples": {},
+        "stop": threading.Event(),
+    }
+    _state["sampler"] = threading.Thread(target=sample_stacks, daemon=True)
+    _state["sampler"].start()
+    logging.info(f"Profiling enabled, writing to {out_dir}")
+
+# ---------------- Stages ----------------
+@contextmanager
+def overhead():
+    # Snapshot bookkeeping is kept out of the stage timings and the sampled stacks
+    _state["busy"] = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _state["overhead"] += time.perf_counter() - start
+        _state["busy"] = False
+
+@contextmanager
+def stage(name):
+    # Stages are tracked on the main thread; sink and fan-out workers show up
+    # in the sampled stacks instead
+    if _state is None or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    # cProfile only allows one active profiler, so an inner stage pauses the outer one
+    stack = _state["stack"]
+    with overhead():
+        if stack:
+            _state["profiles"][stack[-1]].disable()
+        profile = _state["profiles"].setdefault(name, cProfile.Profile())
+        before = tracemalloc.take_snapshot()
+
+    stack.append(name)
+    spent = _state["overhead"]
+    start = time.perf_counter()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        elapsed = time.perf_counter() - start - (_state["overhead"] - spent)
+        stack.pop()
+
+        with overhead():
+            after = tracemalloc.take_snapshot()
+            _state["wall"][name] = _state["wall"].get(name, 0.0) + elapsed
+            _state["calls"][name] = _state["calls"].get(name, 0) + 1
+
+            sites = _state["allocations"].setdefault(name, {})
+            for stat in after.compare_to(before, "lineno"):
+                key = str(stat.traceback)
+                sites[key] = sites.get(key, 0) + stat.size_diff
+
+            if stack:
+                _state["profiles"][stack[-1]].enable()
+
+# ---------------- Sampling ----------------
+def sample_stacks():
+    # Collapsed stacks ("stage;frame;frame count") for flamegraph.pl / speedscope
+    main_id = threading.main_thread().ident
+    own_id = threading.get_ident()
+
+    while not _state["stop"].wait(SAMPLE_INTERVAL):
+        if _state["busy"]:
+            continue
+        stage_name = ";".join(_state["stack"]) or "idle"
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+
+            root = stage_name if thread_id == main_id else f"{stage_name};worker"
+            key = ";".join([root] + frames[::-1])
+            _state["samples"][key] = _state["samples"].get(key, 0) + 1
+
+# ---------------- Reports ----------------
+def finish():
+    global _state
+    if _state is None:
+        return
+
+    _state["stop"].set()
+    _state["sampler"].join()
+    tracemalloc.stop()
+    out_dir = _state["dir"]
+
+    for name, profile in _state["profiles"].items():
+        profile.dump_stats(os.path.join(out_dir, f"{name}.pstats"))
+
+    with open(os.path.join(out_dir, "stacks.collapsed"), "w") as f:
+        for key, count in sorted(_state["samples"].items()):
+            f.write(f"{key} {count}\n")
+
+    with open(os.path.join(out_dir, "allocations.txt"), "w") as f:
+        for name, sites in _state["allocations"].items():
+            f.write(f"== {name} ==\n")
+            for site, size in sorted(sites.items(), key=lambda kv: -kv[1])[:TOP_ALLOCATORS]:
+                f.write(f"{size / 1024:10.1f} KiB  {site}\n")
+            f.write("\n")
+
+    with open(os.path.join(out_dir, "summary.txt"), "w") as f:
+        for name, wall in sorted(_state["wall"].items(), key=lambda kv: -kv[1]):
+            f.write(f"{name:<28} {wall:8.3f}s  {_state['calls'][name]} call(s)\n")
+        f.write("\n")
+        for name, profile in _state["profiles"].items():
+            f.write(f"== {name} ==\n")
+            pstats.Stats(profile, stream=f).sort_stats("cumulative").print_stats(15)
+
+    logging.info(f"Profile written to {out_dir}")
+    _state = None
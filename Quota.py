@@ -0,0 +1,190 @@
+import time
+import random
+import logging
+import threading
+import httplib2
+import google_auth_httplib2
+from googleapiclient.errors import HttpError
+
+import LRP
+import Profile
+
+# ---------------- Constants ----------------
+# Sheets allows 60 read and 60 write requests per minute per user per project
+READ_REQUESTS_PER_MINUTE = 60
+WRITE_REQUESTS_PER_MINUTE = 60
+
+MAX_RETRIES = 6
+BACKOFF_BASE = 1.0   # seconds, doubled on every retry
+BACKOFF_MAX = 64.0
+RETRY_STATUSES = {429, 500, 503}
+QUOTA_WINDOW = 60.0  # seconds the per-minute limits are counted over
+
+# ---------------- Token Bucket ----------------
+class TokenBucket:
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Blocks until a token is free; returns the seconds spent waiting
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def drain(self):
+        # Called after a 429 so the next caller waits for the window to refill
+        with self.lock:
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+
+# ---------------- Sheets Client ----------------
+class SheetsClient:
+    # Every spreadsheets.values call goes through here. Writes are queued per
+    # spreadsheet and sent as one batchClear plus one batchUpdate on flush().
+
+    def __init__(self, service, creds=None):
+        # httplib2 isn't thread-safe; with creds each thread gets its own connection
+        self.values = service.spreadsheets().values()
+        self.creds = creds
+        self.local = threading.local()
+        self.buckets = {
+            "read": TokenBucket(READ_REQUESTS_PER_MINUTE),
+            "write": TokenBucket(WRITE_REQUESTS_PER_MINUTE),
+        }
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.usage = {"read": 0, "write": 0, "retries": 0, "throttled": 0, "waited": 0.0}
+        self.sent = {"read": [], "write": []}  # monotonic send times, for the peak window
+
+    # -------- Execution --------
+    def execute(self, request, kind):
+        for attempt in range(MAX_RETRIES + 1):
+            waited = self.buckets[kind].acquire()
+            with self.lock:
+                self.usage[kind] += 1
+                self.usage["waited"] += waited
+                self.sent[kind].append(time.monotonic())
+
+            try:
+                if self.creds:
+                    return request.execute(http=self.http())
+                return request.execute()
+            except HttpError as e:
+                status = e.resp.status
+                if status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    raise
+
+                delay = retry_delay(e, attempt)
+                if status == 429:
+                    self.buckets[kind].drain()
+                with self.lock:
+                    self.usage["retries"] += 1
+                    self.usage["throttled"] += status == 429
+                    self.usage["waited"] += delay
+
+                logging.warning(f"Sheets returned {status}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def http(self):
+        if not hasattr(self.local, "http"):
+            self.local.http = google_auth_httplib2.AuthorizedHttp(self.creds, http=httplib2.Http())
+        return self.local.http
+
+    # -------- Reads --------
+    def get(self, spreadsheet_id, range_):
+        return self.execute(
+            self.values.get(spreadsheetId=spreadsheet_id, range=range_),
+            "read"
+        )
+
+    # -------- Writes (coalesced) --------
+    def queue(self, spreadsheet_id):
+        with self.lock:
+            return self.pending.setdefault(spreadsheet_id, {"clear": [], "data": {}})
+
+    def clear(self, spreadsheet_id, ranges):
+        batch = self.queue(spreadsheet_id)
+        with self.lock:
+            batch["clear"].extend(r for r in ranges if r not in batch["clear"])
+
+    def update(self, spreadsheet_id, range_, values):
+        # A later write to the same range replaces the earlier one
+        batch = self.queue(spreadsheet_id)
+        with self.lock:
+            batch["data"][range_] = values
+
+    def flush(self, spreadsheet_id=None):
+        with self.lock:
+            ids = [spreadsheet_id] if spreadsheet_id else list(self.pending)
+            batches = [(i, self.pending.pop(i)) for i in ids if i in self.pending]
+
+        for sid, batch in batches:
+            if batch["clear"]:
+                self.execute(
+                    self.values.batchClear(
+                        spreadsheetId=sid,
+                        body={"ranges": batch["clear"]}
+                    ),
+                    "write"
+                )
+            if batch["data"]:
+                self.execute(
+                    self.values.batchUpdate(
+                        spreadsheetId=sid,
+                        body={
+                            "valueInputOption": "RAW",
+                            "data": [{"range": r, "values": v} for r, v in batch["data"].items()],
+                        }
+                    ),
+                    "write"
+                )
+
+    # -------- Reporting --------
+    def peak(self, kind):
+        # Most requests sent in any QUOTA_WINDOW, which is what the limits count
+        with self.lock:
+            sent = sorted(self.sent[kind])
+        most = start = 0
+        for end, at in enumerate(sent):
+            while at - sent[start] >= QUOTA_WINDOW:
+                start += 1
+            most = max(most, end - start + 1)
+        return most
+
+    def log_usage(self):
+        u = self.usage
+        logging.info(
+            f"Sheets quota: {u['read']} reads, {u['write']} writes this run; peak "
+            f"{self.peak('read')}/{READ_REQUESTS_PER_MINUTE} reads, "
+            f"{self.peak('write')}/{WRITE_REQUESTS_PER_MINUTE} writes in any {QUOTA_WINDOW:g}s; "
+            f"{u['retries']} retries ({u['throttled']} throttled), {u['waited']:.1f}s waited"
+        )
+
+def connect():
+    with Profile.stage("auth"):
+        creds = LRP.get_credentials()
+        return SheetsClient(LRP.get_sheets_service(creds), creds)
+
+def retry_delay(error, attempt):
+    retry_after = error.resp.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
@@ -0,0 +1,257 @@
+import logging
+import argparse
+from datetime import date, timedelta
+
+import Config
+import Layout
+import Ladder
+import Store
+import Snapshot
+import Changes
+
+# ---------------- Constants ----------------
+# Aggregates per (report, endorsement length) of the row the sheet shows for it
+# each day: Ladder.pick at the report's coverage, so the level it sits at can
+# drift from day to day like the sheet's does. Kept beside the raw rows:
+#   rollup_daily   one row per EffectiveDate, straight from the ingested report
+#   rollup_weekly  calendar weeks (Monday start), rebuilt from at most 7 daily rows
+#   rollup_window  trailing ROLLUP_WINDOWS ending at the key's newest date
+# Prices are cents; NULL when the cell didn't parse.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_daily (
+    report TEXT NOT NULL, weeks INTEGER NOT NULL, effective_date TEXT NOT NULL,
+    level_bp INTEGER NOT NULL,  -- the coverage level picked that day
+    coverage_price INTEGER, producer_premium INTEGER,
+    PRIMARY KEY (report, weeks, effective_date)
+);
+CREATE TABLE IF NOT EXISTS rollup_weekly (
+    report TEXT NOT NULL, weeks INTEGER NOT NULL, week_start TEXT NOT NULL,
+    days INTEGER NOT NULL, price_avg INTEGER, premium_avg INTEGER,
+    PRIMARY KEY (report, weeks, week_start)
+);
+CREATE TABLE IF NOT EXISTS rollup_window (
+    report TEXT NOT NULL, weeks INTEGER NOT NULL, days INTEGER NOT NULL, as_of TEXT NOT NULL,
+    price_min INTEGER, price_min_date TEXT, price_max INTEGER, price_max_date TEXT,
+    premium_avg INTEGER, premium_first INTEGER, premium_last INTEGER,
+    PRIMARY KEY (report, weeks, days)
+);
+"""
+
+# ---------------- Daily ----------------
+def cents_or_none(text):
+    value = Snapshot.cents(text)
+    return None if value == Snapshot.MISSING_CENTS else value
+
+def report_selection(report):
+    return (
+        report.get("state", Config.STATE_VALUE),
+        report.get("commodity", Config.COMMODITY_VALUE),
+        report["type"],
+    )
+
+def daily_rows(result, report):
+    # {weeks: (level_bp, coverage_price, producer_premium)} for the row the
+    # sheet shows for each endorsement length
+    ladder = result.get("ladder") or Ladder.build_ladder(result["rows"])
+    level = report.get("coverage", Config.COVERAGE_TARGET)
+
+    daily = {}
+    for weeks in ladder:
+        row = Ladder.pick(ladder, weeks, level)
+        if row is None:
+            continue
+        daily[weeks] = (
+            Changes.row_key(row)[1], cents_or_none(row["coverage_price"]), cents_or_none(row["producer_premium"])
+        )
+    return daily
+
+def average(values):
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values)) if values else None
+
+# ---------------- Weekly ----------------
+def week_start(effective_date):
+    day = date.fromisoformat(effective_date)
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+def refresh_week(conn, key, effective_date):
+    start = week_start(effective_date)
+    end = (date.fromisoformat(start) + timedelta(days=6)).isoformat()
+    daily = conn.execute("""
+        SELECT coverage_price, producer_premium FROM rollup_daily
+        WHERE report=? AND weeks=? AND effective_date BETWEEN ? AND ?
+    """, key + (start, end)).fetchall()
+
+    if not daily:
+        conn.execute("DELETE FROM rollup_weekly WHERE report=? AND weeks=? AND week_start=?", key + (start,))
+        return
+    conn.execute(
+        "INSERT OR REPLACE INTO rollup_weekly VALUES (?, ?, ?, ?, ?, ?)",
+        key + (start, len(daily), average(d[0] for d in daily), average(d[1] for d in daily))
+    )
+
+# ---------------- Windows ----------------
+def refresh_windows(conn, key):
+    # Anchored at the key's newest date, so a late older report can't move it back
+    as_of = conn.execute(
+        "SELECT MAX(effective_date) FROM rollup_daily WHERE report=? AND weeks=?", key
+    ).fetchone()[0]
+    if as_of is None:
+        conn.execute("DELETE FROM rollup_window WHERE report=? AND weeks=?", key)
+        return
+
+    longest = max(Config.ROLLUP_WINDOWS)
+    since = (date.fromisoformat(as_of) - timedelta(days=longest - 1)).isoformat()
+    daily = conn.execute("""
+        SELECT effective_date, coverage_price, producer_premium FROM rollup_daily
+        WHERE report=? AND weeks=? AND effective_date >= ?
+        ORDER BY effective_date
+    """, key + (since,)).fetchall()
+
+    for days in Config.ROLLUP_WINDOWS:
+        start = (date.fromisoformat(as_of) - timedelta(days=days - 1)).isoformat()
+        window = [d for d in daily if d["effective_date"] >= start]
+        prices = [d for d in window if d["coverage_price"] is not None]
+        low = min(prices, key=lambda d: d["coverage_price"], default=None)
+        high = max(prices, key=lambda d: d["coverage_price"], default=None)
+        premiums = [d["producer_premium"] for d in window if d["producer_premium"] is not None]
+
+        conn.execute(
+            "INSERT OR REPLACE INTO rollup_window VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            key + (days, as_of,
+                   low and low["coverage_price"], low and low["effective_date"],
+                   high and high["coverage_price"], high and high["effective_date"],
+                   average(premiums),
+                   premiums[0] if premiums else None, premiums[-1] if premiums else None)
+        )
+
+# ---------------- Update ----------------
+def update(results, conn, reports=None):
+    # Called with each batch of newly ingested reports. Each result is rolled up
+    # for every configured report showing its selection. Work per report is its
+    # own rows plus a bounded read (one week, the longest window) per key it
+    # touches, however much history the store holds.
+    reports = Config.REPORTS if reports is None else reports
+    conn.executescript(SCHEMA)
+    with conn:
+        for result in results.values():
+            effective_date = Store.iso_date(result["effective_date"])
+            selection = (result["state"], result["commodity"], result["type"])
+
+            for report in reports:
+                if report_selection(report) != selection:
+                    continue
+                name = report["name"]
+                daily = daily_rows(result, report)
+
+                # A re-published report replaces its day, including lengths it dropped
+                dropped = {
+                    r[0] for r in conn.execute(
+                        "SELECT weeks FROM rollup_daily WHERE report=? AND effective_date=?", (name, effective_date)
+                    )
+                } - set(daily)
+                conn.execute("DELETE FROM rollup_daily WHERE report=? AND effective_date=?", (name, effective_date))
+                conn.executemany(
+                    "INSERT INTO rollup_daily VALUES (?, ?, ?, ?, ?, ?)",
+                    [(name, weeks, effective_date) + values for weeks, values in daily.items()]
+                )
+
+                for weeks in sorted(set(daily) | dropped):
+                    refresh_week(conn, (name, weeks), effective_date)
+                    refresh_windows(conn, (name, weeks))
+
+                logging.info(f"Rolled up {len(daily)} length(s) for {name} on {effective_date}")
+
+def rebuild(conn, reports=None):
+    # From the raw rows, oldest date first; for a store rebuilt outside Run, or
+    # after a report's coverage or selection changed in Config
+    conn.executescript(SCHEMA)
+    with conn:
+        for table in ("rollup_daily", "rollup_weekly", "rollup_window"):
+            conn.execute(f"DELETE FROM {table}")
+
+    for effective_date in Store.effective_dates(conn):
+        results = {}
+        for row in Store.load_rows(conn, effective_date):
+            name = "/".join([row["state"], row["commodity"], row["type"]])
+            result = results.setdefault(name, {
+                "effective_date": effective_date,
+                "state": row["state"],
+                "commodity": row["commodity"],
+                "type": row["type"],
+                "rows": [],
+            })
+            result["rows"].append(dict(row))
+        update(results, conn, reports)
+
+# ---------------- Sheet Block ----------------
+def dollars(cents):
+    return "" if cents is None else f"${cents / 100:.2f}"
+
+def summary_rows(conn, reports=None):
+    # Reads only the rollup tables: for each report and endorsement length on
+    # the sheet, the level shown on the newest day, then one weekly row and one
+    # row per window
+    reports = Config.REPORTS if reports is None else reports
+    conn.executescript(SCHEMA)
+    windows = Config.ROLLUP_WINDOWS
+    trend = windows[0]
+
+    header = ["Type", "Weeks", "Coverage Level", "Week Avg Price"]
+    for days in windows:
+        header += [f"{days}d Low", f"{days}d High"]
+    header += [f"Premium {trend}d Change"]
+    rows = [header]
+
+    for report in reports:
+        for weeks in Layout.report_weeks(report):
+            key = (report["name"], weeks)
+            newest = conn.execute("""
+                SELECT level_bp FROM rollup_daily WHERE report=? AND weeks=?
+                ORDER BY effective_date DESC LIMIT 1
+            """, key).fetchone()
+            if newest is None:
+                continue
+
+            weekly = conn.execute("""
+                SELECT price_avg FROM rollup_weekly WHERE report=? AND weeks=?
+                ORDER BY week_start DESC LIMIT 1
+            """, key).fetchone()
+            by_days = {
+                w["days"]: w for w in conn.execute("SELECT * FROM rollup_window WHERE report=? AND weeks=?", key)
+            }
+
+            level_bp = newest["level_bp"]
+            shown = "" if level_bp == Snapshot.MISSING_LEVEL else f"{level_bp / 100:.2f}%"
+            row = [report["name"], weeks, shown, dollars(weekly and weekly["price_avg"])]
+            for days in windows:
+                w = by_days.get(days)
+                row += [dollars(w and w["price_min"]), dollars(w and w["price_max"])]
+
+            w = by_days.get(trend)
+            if w and w["premium_first"] is not None:
+                row.append(f"{(w['premium_last'] - w['premium_first']) / 100:+.2f}")
+            else:
+                row.append("")
+            rows.append(row)
+
+    return rows
+
+# ---------------- Run ----------------
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    # python Rollups.py            (print the summary block)
+    # python Rollups.py --rebuild  (recompute every rollup from the stored rows)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    conn = Store.connect()
+    try:
+        if args.rebuild:
+            rebuild(conn)
+        for row in summary_rows(conn):
+            print("\t".join(str(c) for c in row))
+    finally:
+        conn.close()
@@ -0,0 +1,197 @@
+import argparse
+import logging
+
+import Config
+import LRP
+import Layout
+import Catalog
+import Quota
+import Ladder
+import Fingerprint
+import Profile
+import SingleFlight
+import Store
+import Snapshot
+import Calculator
+import Changes
+import Sinks
+import Archive
+import Rollups
+
+# ---------------- Fetch ----------------
+def report_selection(report):
+    return (
+        report.get("state", Config.STATE_VALUE),
+        report.get("commodity", Config.COMMODITY_VALUE),
+        report["type"],
+    )
+
+def written_everywhere(report):
+    # A target added since the last run still needs the block, and one whose
+    # blocks moved (a report inserted, a gap or weeks changed) needs it rewritten
+    # at the new range, changed or not
+    for name in Sinks.report_sinks(report):
+        options = Config.SINKS[name]
+        if options["kind"] != "sheets":
+            continue
+        for target in options.get("targets", Config.TARGETS):
+            block = next((b for b in Layout.compute_blocks(target=target) if b["name"] == report["name"]), None)
+            if block is None:
+                continue
+            written = Layout.load_layout(target["spreadsheet_id"]).get(report["name"])
+            if not written or written["range"] != block["range"]:
+                return False
+    return True
+
+def fetch_all(reports, session, fingerprints, sinks=None):
+    # Returns the sheet values per report and the parsed report behind them
+    # (effective date, selection, rows and ladder). Reports whose table region
+    # hashes the same as last run are left out, and fingerprints is updated in
+    # place for the ones that changed. Each parsed report is handed to its sinks
+    # straight away, so delivery overlaps with fetching the next one.
+    values = {}
+    results = {}
+    for report in reports:
+        state_value, commodity_value, type_value = report_selection(report)
+        weeks = Layout.report_weeks(report)
+        coverage = report.get("coverage", Config.COVERAGE_TARGET)
+
+        # Fail before any wizard traffic if a code is already known to be gone
+        Catalog.validate_selection(state_value, commodity_value, type_value)
+
+        # Runs that overlap on the same EffectiveDate share one wizard walk
+        with Profile.stage("wizard.load"):
+            soup = LRP.load_page(session)
+        effective_date = LRP.get_first_option_value(soup, "EffectiveDate")
+
+        html = SingleFlight.fetch_once(
+            (effective_date, state_value, commodity_value, type_value),
+            lambda: LRP.fetch_report(session, state_value, commodity_value, type_value, soup)
+        )
+
+        key = Fingerprint.report_key(state_value, commodity_value, type_value, weeks, coverage)
+        fingerprint = Fingerprint.fingerprint(html)
+
+        # Every response is kept raw, so the history can be re-parsed offline
+        with Profile.stage("archive"):
+            Archive.archive(effective_date, state_value, commodity_value, type_value, html, fingerprint)
+
+        if fingerprints.get(key) == fingerprint and written_everywhere(report):
+            logging.info(f"{report['name']} unchanged since last run — skipping parse and write")
+            continue
+        fingerprints[key] = fingerprint
+
+        with Profile.stage("parse"):
+            rows = LRP.parse_rows(html)
+            ladder = Ladder.build_ladder(rows)
+            values[report["name"]] = LRP.sheet_values(ladder, weeks, coverage)
+
+        results[report["name"]] = {
+            "effective_date": effective_date,
+            "state": state_value,
+            "commodity": commodity_value,
+            "type": type_value,
+            "rows": rows,
+            "ladder": ladder,
+        }
+        if sinks is not None:
+            Sinks.dispatch(sinks, report, dict(
+                results[report["name"]], name=report["name"], values=values[report["name"]]
+            ))
+
+        logging.info(f"Selected Data ({report['name']}):")
+        for week, row in zip(weeks, values[report["name"]]):
+            logging.info(f"Week {week}: {row}")
+
+    return values, results
+
+# ---------------- Run ----------------
+def run(names=None, session=None, client=None):
+    # session and client can be passed in warm (see Daemon.py); returns what changed
+    reports = [r for r in Config.REPORTS if not names or r["name"] in names]
+    unknown = set(names or []) - {r["name"] for r in Config.REPORTS}
+    if unknown:
+        raise Exception(f"Unknown report(s): {', '.join(sorted(unknown))}")
+
+    uses_sheets = any(
+        Config.SINKS[name]["kind"] == "sheets" for r in reports for name in Sinks.report_sinks(r)
+    )
+    if client is None and (uses_sheets or Config.CHANGES_RANGE or Config.CALCULATOR_RANGE or Config.ROLLUP_RANGE):
+        client = Quota.connect()
+
+    fingerprints = Fingerprint.load_fingerprints()
+    sinks = Sinks.open_sinks(reports, client)
+    try:
+        values, results = fetch_all(reports, session or LRP.new_session(), fingerprints, sinks)
+
+        # History is local, so it is kept even if a sink can't be reached
+        if values:
+            with Profile.stage("store"):
+                conn = Store.connect()
+                try:
+                    pending = Changes.detect(results, conn)
+                    Store.ingest(results, conn)
+                    Rollups.update(results, conn)
+                    Snapshot.publish(conn)
+                    rollup_rows = Rollups.summary_rows(conn) if Config.ROLLUP_RANGE else None
+                finally:
+                    conn.close()
+    finally:
+        with Profile.stage("write"):
+            failed = Sinks.close_sinks(sinks)
+
+    if not values:
+        logging.info("No report changed — nothing to write")
+        if client:
+            client.log_usage()
+        return values, results
+    if failed:
+        raise Exception(f"Delivery failed for sink(s): {', '.join(failed)}")
+
+    # Moves are only marked as seen once delivered, so a failed run alerts again on retry
+    with Profile.stage("store"):
+        conn = Store.connect()
+        try:
+            alerts = Changes.commit(pending, conn)
+        finally:
+            conn.close()
+
+    # Rewritten on every run that took in new reports: a quiet day shows just the header
+    if Config.CHANGES_RANGE:
+        client.clear(Config.TARGETS[0]["spreadsheet_id"], [Config.CHANGES_RANGE])
+        client.update(Config.TARGETS[0]["spreadsheet_id"], Config.CHANGES_RANGE, Changes.alert_rows(alerts))
+        client.flush()
+
+    if rollup_rows:
+        client.update(Config.TARGETS[0]["spreadsheet_id"], Config.ROLLUP_RANGE, rollup_rows)
+        client.flush()
+
+    if Config.HERDS and Config.CALCULATOR_RANGE:
+        with Profile.stage("calculator"):
+            rows = Calculator.summary_rows(Calculator.load_ladder())
+            client.update(Config.TARGETS[0]["spreadsheet_id"], Config.CALCULATOR_RANGE, rows)
+            client.flush()
+
+    if client:
+        client.log_usage()
+
+    # Only remembered once every sink took the reports, so a failed run retries in full
+    Fingerprint.save_fingerprints(fingerprints)
+    return values, results
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    # python Run.py [NAME ...] [--profile]  e.g.  python Run.py Steers1 Steers2
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*")
+    parser.add_argument("--profile", action="store_true",
+                        help="write per-stage pstats, allocations and collapsed stacks to profile/")
+    args = parser.parse_args()
+
+    if args.profile:
+        Profile.enable()
+    try:
+        run(args.names)
+    finally:
+        Profile.finish()
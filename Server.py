@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import zlib
+import logging
+import argparse
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+import Config
+import Store
+import Ladder
+
+# ---------------- Constants ----------------
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+RELOAD_CHECK = 1.0  # seconds between checks for new rows in the store
+
+# ---------------- Index ----------------
+# {"dates": [...], "by_date": {date: {"state/commodity/type": {"rows": [...], "ladder": {...}}}}}
+index = {"dates": [], "by_date": {}}
+responses = {}
+lock = threading.Lock()
+store = {"conn": None, "version": None, "checked": 0.0}
+
+def build_index(conn):
+    by_date = {}
+    for r in Store.load_rows(conn):
+        row = dict(r)
+        key = "/".join([row["state"], row["commodity"], row["type"]])
+        report = by_date.setdefault(row["effective_date"], {}).setdefault(key, {"rows": []})
+        report["rows"].append(row)
+
+    for reports in by_date.values():
+        for report in reports.values():
+            report["ladder"] = Ladder.build_ladder(report["rows"])
+
+    return {"dates": sorted(by_date), "by_date": by_date}
+
+def refresh_index(force=False):
+    # PRAGMA data_version only moves when another connection commits, so this is
+    # a cheap way to notice a new ingest without re-reading the table
+    global index, responses
+    now = time.monotonic()
+    if not force and now - store["checked"] < RELOAD_CHECK:
+        return
+
+    with lock:
+        store["checked"] = now
+        version = store["conn"].execute("PRAGMA data_version").fetchone()[0]
+        if force or version != store["version"]:
+            index = build_index(store["conn"])
+            responses = {}
+            store["version"] = version
+            logging.info(f"Index loaded: {len(index['dates'])} effective date(s)")
+
+# ---------------- Queries ----------------
+def matches(value, code):
+    return code is None or value == code or value.split("|")[0] == code
+
+def select_reports(keys, params):
+    # type accepts a report name from Config ("Steers1"), a code ("809") or the
+    # full value; state and commodity narrow it down the same way
+    type_code = params.get("type")
+    for report in Config.REPORTS:
+        if type_code and report["name"].lower() == type_code.lower():
+            type_code = report["type"]
+
+    selected = []
+    for key in keys:
+        state_value, commodity_value, type_value = key.split("/")
+        if (matches(state_value, params.get("state"))
+                and matches(commodity_value, params.get("commodity"))
+                and matches(type_value, type_code)):
+            selected.append(key)
+    return selected
+
+def query(params):
+    dates = index["dates"]
+    if not dates:
+        return 404, {"error": "store is empty"}
+
+    date = Store.iso_date(params.get("date", dates[-1]))
+    reports = index["by_date"].get(date)
+    if reports is None:
+        return 404, {"error": f"no report for {date}", "dates": dates}
+
+    keys = select_reports(reports, params)
+    if not keys:
+        return 404, {"error": "no matching report", "reports": list(reports)}
+
+    weeks = int(params["weeks"]) if "weeks" in params else None
+    level = float(params["level"]) if "level" in params else None
+
+    body = {"effective_date": date, "reports": {}}
+    for key in keys:
+        report = reports[key]
+        if level is not None:
+            ladder = report["ladder"]
+            picked = [Ladder.nearest(ladder, w, level) for w in ([weeks] if weeks else sorted(ladder))]
+            rows = [r for r in picked if r]
+        else:
+            rows = [r for r in report["rows"] if weeks is None or r["weeks"] == weeks]
+        body["reports"][key] = [{f: r[f] for f in Store.ROW_FIELDS} for r in rows]
+
+    return 200, body
+
+def respond(path, params):
+    # Responses are rendered once per index version and then served from memory
+    key = (path, tuple(sorted(params.items())))
+    cached = responses.get(key)
+    if cached:
+        return cached
+
+    try:
+        if path == "/dates":
+            status, body = 200, {"dates": index["dates"]}
+        elif path in ("/prices", "/latest"):
+            status, body = query(params)
+        else:
+            status, body = 404, {"error": f"unknown path {path}"}
+    except ValueError as e:
+        status, body = 400, {"error": str(e)}
+
+    payload = json.dumps(body).encode("utf-8")
+    cached = (status, f'"{store["version"]}-{zlib.crc32(payload):08x}"', payload)
+    if status == 200:
+        responses[key] = cached
+    return cached
+
+# ---------------- HTTP ----------------
+class QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        refresh_index()
+        url = urlsplit(self.path)
+        status, etag, payload = respond(url.path.rstrip("/") or "/", dict(parse_qsl(url.query)))
+
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+# ---------------- Run ----------------
+def serve(host=SERVER_HOST, port=SERVER_PORT, unix_path=None, store_path=None):
+    store["conn"] = Store.connect(store_path, shared=True)
+    refresh_index(force=True)
+
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.remove(unix_path)
+        server = UnixHTTPServer(unix_path, QueryHandler)
+        logging.info(f"Serving LRP prices on {unix_path}")
+    else:
+        server = ThreadingHTTPServer((host, port), QueryHandler)
+        logging.info(f"Serving LRP prices on http://{host}:{port}")
+
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    # python Server.py [--port N | --unix PATH]
+    #   GET /dates
+    #   GET /latest
+    #   GET /prices?type=809&weeks=13&level=1.0&date=2026-10-16&state=38
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--store", default=Store.STORE_FILE)
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.unix, args.store)
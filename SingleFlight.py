@@ -0,0 +1,73 @@
+import os
+import time
+import fcntl
+import hashlib
+import logging
+from contextlib import contextmanager
+
+# ---------------- Constants ----------------
+FLIGHT_DIR = ".singleflight"
+RESULT_TTL = 60 * 60  # seconds before a leftover result file is deleted
+
+# ---------------- Locks ----------------
+def key_name(*parts):
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:20]
+
+@contextmanager
+def lock(name):
+    # flock is released by the kernel if the holder dies, so a crash never wedges a key
+    os.makedirs(FLIGHT_DIR, exist_ok=True)
+    with open(os.path.join(FLIGHT_DIR, f"{name}.lock"), "a") as f:
+        start = time.monotonic()
+        fcntl.flock(f, fcntl.LOCK_EX)
+        waited = time.monotonic() - start
+        if waited > 0.1:
+            logging.info(f"Waited {waited:.1f}s for in-flight {name}")
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+# ---------------- Results ----------------
+def result_path(name):
+    return os.path.join(FLIGHT_DIR, f"{name}.result")
+
+def load_result(name, since):
+    # Only a result written after `since` came from a fetch that was in flight
+    path = result_path(name)
+    if not os.path.exists(path) or os.path.getmtime(path) < since:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def save_result(name, result):
+    path = result_path(name)
+    tmp = path + f".{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(result)
+    os.replace(tmp, path)
+    prune()
+
+def prune():
+    now = time.time()
+    for entry in os.listdir(FLIGHT_DIR):
+        path = os.path.join(FLIGHT_DIR, entry)
+        if entry.endswith(".result") and now - os.path.getmtime(path) > RESULT_TTL:
+            os.remove(path)
+
+# ---------------- Single Flight ----------------
+def fetch_once(key, fetch):
+    # The first process to reach a key runs fetch(); everyone already queued
+    # behind the lock gets that result instead of repeating the request. A
+    # caller that arrives after the fetch finished fetches again.
+    name = key_name(*key)
+    waiting_since = time.time()
+    with lock(name):
+        result = load_result(name, waiting_since)
+        if result is not None:
+            logging.info(f"Using result fetched by another run for {' / '.join(key)}")
+            return result
+
+        result = fetch()
+        save_result(name, result)
+        return result
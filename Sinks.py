@@ -0,0 +1,212 @@
+import os
+import csv
+import json
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import Config
+import Layout
+import Store
+import Profile
+import SingleFlight
+
+# ---------------- Constants ----------------
+DEFAULT_BATCH = 50       # records per delivery
+DEFAULT_INTERVAL = 1.0   # seconds a partial batch may wait for more records
+DEFAULT_QUEUE = 200      # records buffered before put() starts to wait
+PUT_TIMEOUT = 30.0       # seconds put() waits on a full queue before dropping
+
+CSV_FIELDS = ["name", "effective_date", "state", "commodity", "type"] + Store.ROW_FIELDS
+
+_closed = object()
+
+# ---------------- Base ----------------
+class Sink:
+    # Each sink owns a bounded queue and a worker thread, so a stalled sink only
+    # backs up its own queue. Records are report dicts as built by Run.fetch_all.
+    # With "flush": "close" records are held instead and delivered as one batch
+    # by close(), on the caller's thread and under its own profile stage.
+    default_flush = "interval"
+
+    def __init__(self, name, options):
+        self.name = name
+        self.options = options
+        self.batch_size = options.get("batch", DEFAULT_BATCH)
+        self.interval = options.get("interval", DEFAULT_INTERVAL)
+        self.on_close = options.get("flush", self.default_flush) == "close"
+        self.queue = queue.Queue(maxsize=options.get("queue", DEFAULT_QUEUE))
+        self.held = []
+        self.errors = []
+        self.delivered = 0
+        self.thread = None
+        if not self.on_close:
+            self.thread = threading.Thread(target=self.loop, name=f"sink-{name}", daemon=True)
+            self.thread.start()
+
+    def put(self, record):
+        if self.on_close:
+            self.held.append(record)
+            return
+        try:
+            self.queue.put(record, timeout=PUT_TIMEOUT)
+        except queue.Full:
+            self.errors.append(f"queue full, dropped {record['name']}")
+            logging.error(f"Sink {self.name}: queue full, dropped {record['name']}")
+
+    def loop(self):
+        done = False
+        while not done:
+            batch = []
+            record = self.queue.get()
+            deadline = time.monotonic() + self.interval
+
+            while record is not _closed:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            done = record is _closed
+
+            if batch:
+                self.send(batch)
+
+    def send(self, batch):
+        try:
+            self.deliver(batch)
+            self.delivered += len(batch)
+        except Exception as e:
+            logging.exception(f"Sink {self.name} failed on {len(batch)} record(s)")
+            self.errors.append(str(e))
+
+    def close(self):
+        if self.on_close:
+            if self.held:
+                with Profile.stage(f"write.{self.name}"):
+                    self.send(self.held)
+        else:
+            self.queue.put(_closed)
+            self.thread.join()
+        logging.info(f"Sink {self.name}: {self.delivered} record(s) delivered, {len(self.errors)} error(s)")
+        return not self.errors
+
+    def deliver(self, batch):
+        raise NotImplementedError
+
+# ---------------- Google Sheets ----------------
+class SheetsSink(Sink):
+    # Held until close(), so a run is one batchClear/batchUpdate per spreadsheet
+    default_flush = "close"
+
+    def __init__(self, name, options, client):
+        self.client = client
+        self.targets = options.get("targets", Config.TARGETS)
+        super().__init__(name, options)
+
+    def write_target(self, target, values):
+        spreadsheet_id = target["spreadsheet_id"]
+        blocks = Layout.compute_blocks(target=target)
+
+        # Planned under the lock, so a run that lost the race sees the blocks the
+        # winner just wrote and has nothing left to send
+        with SingleFlight.lock(SingleFlight.key_name("sheet", spreadsheet_id)):
+            plan = Layout.plan_writes(blocks, values, Layout.load_layout(spreadsheet_id))
+            Layout.apply_plan(self.client, spreadsheet_id, plan)
+        return spreadsheet_id
+
+    def deliver(self, batch):
+        # One batch per spreadsheet, all spreadsheets in parallel
+        values = {record["name"]: record["values"] for record in batch}
+        with ThreadPoolExecutor(max_workers=max(1, len(self.targets))) as pool:
+            futures = [pool.submit(self.write_target, target, values) for target in self.targets]
+            for future in futures:
+                logging.info(f"Upload complete: {future.result()}")
+
+# ---------------- Files ----------------
+class CsvSink(Sink):
+    def deliver(self, batch):
+        path = self.options["path"]
+        new = not os.path.exists(path)
+        with open(path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if new:
+                writer.writeheader()
+            for record in batch:
+                for row in record["rows"]:
+                    writer.writerow(dict(row, **{k: record[k] for k in CSV_FIELDS[:5]}))
+
+class JsonlSink(Sink):
+    def deliver(self, batch):
+        with open(self.options["path"], "a") as f:
+            for record in batch:
+                f.write(json.dumps(export(record), separators=(",", ":")) + "\n")
+
+# ---------------- SQLite ----------------
+class SqliteSink(Sink):
+    def deliver(self, batch):
+        # Same schema as the history store, in whatever file the sink points at
+        conn = Store.connect(self.options["path"])
+        try:
+            Store.ingest({record["name"]: record for record in batch}, conn)
+        finally:
+            conn.close()
+
+# ---------------- Webhook ----------------
+class WebhookSink(Sink):
+    def __init__(self, name, options):
+        self.session = requests.Session()
+        super().__init__(name, options)
+
+    def deliver(self, batch):
+        resp = self.session.post(
+            self.options["url"],
+            json={"records": [export(record) for record in batch]},
+            timeout=self.options.get("timeout", 10),
+        )
+        resp.raise_for_status()
+
+# ---------------- Registry ----------------
+SINK_KINDS = {
+    "csv": CsvSink,
+    "jsonl": JsonlSink,
+    "sqlite": SqliteSink,
+    "webhook": WebhookSink,
+}
+
+def export(record):
+    # Everything but the in-memory ladder
+    return {k: v for k, v in record.items() if k != "ladder"}
+
+def report_sinks(report):
+    return report.get("sinks", Config.DEFAULT_SINKS)
+
+def open_sinks(reports, client=None):
+    sinks = {}
+    for report in reports:
+        for name in report_sinks(report):
+            if name in sinks:
+                continue
+            options = Config.SINKS.get(name)
+            if options is None:
+                raise Exception(f"Report {report['name']} uses unknown sink {name}")
+
+            if options["kind"] == "sheets":
+                sinks[name] = SheetsSink(name, options, client)
+            else:
+                sinks[name] = SINK_KINDS[options["kind"]](name, options)
+    return sinks
+
+def dispatch(sinks, report, record):
+    for name in report_sinks(report):
+        sinks[name].put(record)
+
+def close_sinks(sinks):
+    # Waits for every queue to drain; returns the names of sinks that had errors
+    return [name for name, sink in sinks.items() if not sink.close()]
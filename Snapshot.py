@@ -0,0 +1,122 @@
+import os
+import re
+import mmap
+import time
+import struct
+import logging
+
+import Store
+
+# ---------------- Layout ----------------
+# Little-endian, fixed size. A file is one HEADER followed by `count` RECORDs.
+#
+#   header: magic "LRPS", version, record size, count, created (unix s), newest effective date (yyyymmdd)
+#   record: effective date (yyyymmdd), state, commodity, type, weeks,
+#           coverage level (basis points), coverage price, cost per cwt, producer premium (cents)
+SNAPSHOT_FILE = "lrp.snapshot"
+MAGIC = b"LRPS"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHIqI8x")
+RECORD = struct.Struct("<IHHHHHxxiii")
+
+MISSING_LEVEL = 0xFFFF
+MISSING_CENTS = -2 ** 31
+
+# Same layout for NumPy readers:
+#   np.frombuffer(mm, dtype=np.dtype(Snapshot.NUMPY_DTYPE), count=header["count"], offset=Snapshot.HEADER.size)
+NUMPY_DTYPE = [
+    ("effective_date", "<u4"),
+    ("state", "<u2"),
+    ("commodity", "<u2"),
+    ("type", "<u2"),
+    ("weeks", "<u2"),
+    ("coverage_level_bp", "<u2"),
+    ("_pad", "V2"),
+    ("coverage_price_cents", "<i4"),
+    ("cost_per_cwt_cents", "<i4"),
+    ("producer_premium_cents", "<i4"),
+]
+
+# ---------------- Encoding ----------------
+def code(value):
+    # "0801|Feeder Cattle" -> 801
+    return int(value.split("|")[0])
+
+def date_number(iso):
+    return int(iso.replace("-", ""))
+
+def cents(text):
+    m = re.search(r"-?\d[\d,]*(?:\.\d+)?", text or "")
+    if not m:
+        return MISSING_CENTS
+    return round(float(m.group().replace(",", "")) * 100)
+
+def encode(row):
+    level = row["coverage_level"]
+    return RECORD.pack(
+        date_number(row["effective_date"]),
+        code(row["state"]),
+        code(row["commodity"]),
+        code(row["type"]),
+        row["weeks"],
+        MISSING_LEVEL if level is None else round(level * 10000),
+        cents(row["coverage_price"]),
+        cents(row["cost_per_cwt"]),
+        cents(row["producer_premium"]),
+    )
+
+# ---------------- Publish ----------------
+def latest_rows(conn):
+    # Newest effective date of every report in the store
+    return conn.execute("""
+        SELECT r.* FROM rows r
+        JOIN (SELECT state, commodity, type, MAX(effective_date) AS effective_date
+              FROM rows GROUP BY state, commodity, type) latest
+        USING (state, commodity, type, effective_date)
+        ORDER BY r.type, r.position
+    """)
+
+def publish(conn=None, path=None):
+    path = path or SNAPSHOT_FILE
+    own = conn is None
+    conn = conn or Store.connect()
+    try:
+        rows = [dict(r) for r in latest_rows(conn)]
+    finally:
+        if own:
+            conn.close()
+
+    newest = max((date_number(r["effective_date"]) for r in rows), default=0)
+    body = b"".join(encode(r) for r in rows)
+
+    # Written beside the target and renamed over it: readers that already mapped
+    # the old file keep a complete copy, new readers get the complete new one
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(rows), int(time.time()), newest))
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    logging.info(f"Snapshot published: {len(rows)} rows to {path}")
+    return len(rows)
+
+# ---------------- Read ----------------
+def open_snapshot(path=None):
+    # Returns (header, mmap); records start at HEADER.size
+    with open(path or SNAPSHOT_FILE, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, record_size, count, created, newest = HEADER.unpack_from(mm)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        mm.close()
+        raise Exception(f"Unsupported snapshot {magic!r} v{version}, record size {record_size}")
+
+    return {"count": count, "created": created, "effective_date": newest}, mm
+
+def records(mm, count):
+    # Zero-copy walk over the mapped records
+    view = memoryview(mm)[HEADER.size:HEADER.size + count * RECORD.size]
+    return RECORD.iter_unpack(view)
@@ -0,0 +1,73 @@
+import sqlite3
+import logging
+from datetime import datetime
+
+# ---------------- Constants ----------------
+STORE_FILE = "lrp.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    effective_date   TEXT    NOT NULL,  -- ISO yyyy-mm-dd
+    state            TEXT    NOT NULL,
+    commodity        TEXT    NOT NULL,
+    type             TEXT    NOT NULL,
+    position         INTEGER NOT NULL,  -- order within the report
+    weeks            INTEGER NOT NULL,
+    coverage_level   REAL,
+    coverage_price   TEXT,
+    cost_per_cwt     TEXT,
+    producer_premium TEXT,
+    PRIMARY KEY (effective_date, state, commodity, type, position)
+);
+CREATE INDEX IF NOT EXISTS rows_by_type ON rows (type, weeks, effective_date);
+"""
+
+ROW_FIELDS = ["weeks", "coverage_level", "coverage_price", "cost_per_cwt", "producer_premium"]
+
+# ---------------- Connection ----------------
+def connect(path=None, shared=False):
+    # shared=True lets one connection serve several threads; callers serialise access
+    conn = sqlite3.connect(path or STORE_FILE, timeout=30, check_same_thread=not shared)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def iso_date(effective_date):
+    # RMA lists dates as mm/dd/yyyy; the store keeps them sortable
+    try:
+        return datetime.strptime(effective_date, "%m/%d/%Y").date().isoformat()
+    except ValueError:
+        return effective_date
+
+# ---------------- Ingest ----------------
+def ingest(results, conn=None):
+    # results as returned by Run.fetch_all; re-ingesting a report replaces it
+    own = conn is None
+    conn = conn or connect()
+    try:
+        with conn:
+            for result in results.values():
+                key = (iso_date(result["effective_date"]), result["state"], result["commodity"], result["type"])
+                conn.execute(
+                    "DELETE FROM rows WHERE effective_date=? AND state=? AND commodity=? AND type=?", key
+                )
+                conn.executemany(
+                    "INSERT INTO rows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [key + (i,) + tuple(row[f] for f in ROW_FIELDS) for i, row in enumerate(result["rows"])]
+                )
+                logging.info(f"Stored {len(result['rows'])} rows for {result['type']} on {key[0]}")
+    finally:
+        if own:
+            conn.close()
+
+# ---------------- Queries ----------------
+def effective_dates(conn):
+    return [r[0] for r in conn.execute("SELECT DISTINCT effective_date FROM rows ORDER BY effective_date")]
+
+def load_rows(conn, effective_date=None):
+    if effective_date:
+        return conn.execute(
+            "SELECT * FROM rows WHERE effective_date=? ORDER BY type, position", (effective_date,)
+        )
+    return conn.execute("SELECT * FROM rows ORDER BY effective_date, type, position")
@@ -0,0 +1,51 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Store
+import Changes
+
+def result(effective_date, rows):
+    return {"Steers1": {
+        "effective_date": effective_date,
+        "state": "38|North Dakota",
+        "commodity": "0801|Feeder Cattle",
+        "type": "809|Steers Weight 1",
+        "rows": [
+            {"weeks": 13, "coverage_level": level, "coverage_price": price,
+             "cost_per_cwt": "$3.00", "producer_premium": "$1.96"}
+            for level, price in rows
+        ],
+    }}
+
+def run_day(conn, results):
+    pending = Changes.detect(results, conn)
+    return pending, Changes.commit(pending, conn)
+
+def latest_levels(conn):
+    return sorted(r[0] for r in conn.execute("SELECT level_bp FROM latest"))
+
+def test_drifted_levels_are_moves(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = Store.connect(str(tmp_path / "lrp.db"))
+    run_day(conn, result("10/19/2026", [(0.9675, "$247.10"), (0.9500, "$243.00")]))
+
+    pending, alerts = run_day(conn, result("10/20/2026", [(0.9688, "$250.00"), (0.9512, "$243.00")]))
+
+    kinds = [c[2] for c in pending["delta"]["reports"]["Steers1"]["changes"]]
+    assert kinds == ["moved"]
+    assert [(a[2]["key"], a[2]["old"], a[2]["new"]) for a in alerts] == [((13, 9688), 24710, 25000)]
+    assert latest_levels(conn) == [9512, 9688]
+
+def test_levels_beyond_tolerance_are_added_and_removed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = Store.connect(str(tmp_path / "lrp.db"))
+    run_day(conn, result("10/19/2026", [(0.9675, "$247.10")]))
+
+    pending, alerts = run_day(conn, result("10/20/2026", [(0.9500, "$250.00")]))
+
+    kinds = sorted(c[2] for c in pending["delta"]["reports"]["Steers1"]["changes"])
+    assert kinds == ["added", "removed"]
+    assert alerts == []
+    assert latest_levels(conn) == [9500]
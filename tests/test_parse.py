@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import LRP
+import Columns
+
+# Header in the live report's column order: the baseline read weeks from
+# cols[2], coverage price from cols[9], cost per cwt from cols[13] and producer
+# premium from cols[14]
+HEADER = [
+    "Commodity", "Type", "Endorsement Length", "Practice", "Sales Effective Date",
+    "End Date", "Number of Head", "Target Weight", "Expected Ending Value",
+    "Coverage Price", "Coverage Price Adjustment", "Coverage Level", "Rate",
+    "Cost Per Cwt", "Producer Premium",
+]
+ROW = [
+    "Feeder Cattle", "Steers Weight 1", "13", "", "10/17/2026",
+    "01/16/2027", "", "", "$255.40",
+    "$247.10", "", "96.75%", "0.012", "$3.02", "$1.96",
+]
+
+def table(header, rows, header_tag="th"):
+    head = "".join(f"<{header_tag}>{h}</{header_tag}>" for h in header)
+    body = "".join("<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>" for row in rows)
+    return f"<html><body><table><tr>{head}</tr>{body}</table></body></html>"
+
+def test_header_maps_to_baseline_columns():
+    index = Columns.resolve(HEADER)
+    assert index["weeks"] == 2
+    assert index["coverage_price"] == 9
+    assert index["coverage_level"] == 11
+    assert index["cost_per_cwt"] == 13
+    assert index["producer_premium"] == 14
+
+def test_parse_rows_reads_baseline_cells():
+    assert LRP.parse_rows(table(HEADER, [ROW])) == [{
+        "weeks": 13,
+        "coverage_level": 0.9675,
+        "coverage_price": "$247.10",
+        "cost_per_cwt": "$3.02",
+        "producer_premium": "$1.96",
+    }]
+
+def test_td_header_in_first_row():
+    assert LRP.parse_rows(table(HEADER, [ROW], header_tag="td"))[0]["producer_premium"] == "$1.96"
+
+def test_missing_required_column_raises():
+    header = [h if h != "Producer Premium" else "Total Premium" for h in HEADER]
+    with pytest.raises(Exception, match="producer_premium"):
+        LRP.parse_rows(table(header, [ROW]))
+
+def test_wide_rows_without_header_raise():
+    with pytest.raises(Exception, match="no recognisable header"):
+        LRP.parse_rows(table(["x"] * len(HEADER), [ROW, ROW], header_tag="td"))
+
+def test_rows_before_header_are_not_probed():
+    # Title row, then narrow notes rows, then the th header: only the first row
+    # and the header should reach the layout cache
+    Columns._layouts.clear()
+    notes = "".join(f"<tr><td>note {i}</td><td>{i}</td></tr>" for i in range(20))
+    head = "".join(f"<th>{h}</th>" for h in HEADER)
+    data = "<tr>" + "".join(f"<td>{c}</td>" for c in ROW) + "</tr>"
+    html = f"<table><tr><td>LRP Report</td></tr>{notes}<tr>{head}</tr>{data}</table>"
+
+    assert len(LRP.parse_rows(html)) == 1
+    assert len(Columns._layouts) == 2
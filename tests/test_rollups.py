@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Store
+import Rollups
+
+STEERS = {"name": "Steers1", "type": "809|Steers Weight 1", "weeks": [13]}
+
+def result(effective_date, rows):
+    return {
+        "effective_date": effective_date,
+        "state": "38|North Dakota",
+        "commodity": "0801|Feeder Cattle",
+        "type": STEERS["type"],
+        "rows": [
+            {"weeks": 13, "coverage_level": level, "coverage_price": price,
+             "cost_per_cwt": "$3.00", "producer_premium": premium}
+            for level, price, premium in rows
+        ],
+    }
+
+# The levels RMA lists drift a little from one day to the next
+DAYS = [
+    result("10/19/2026", [(0.9675, "$247.10", "$1.96"), (0.9500, "$243.00", "$1.20")]),
+    result("10/20/2026", [(0.9688, "$250.00", "$2.10"), (0.9512, "$245.00", "$1.31")]),
+]
+
+def ingest_days(conn, reports):
+    for day in DAYS:
+        Store.ingest({STEERS["name"]: day}, conn)
+        Rollups.update({STEERS["name"]: day}, conn, reports)
+
+def test_windows_follow_the_sheet_row_across_level_drift(tmp_path):
+    conn = Store.connect(str(tmp_path / "lrp.db"))
+    ingest_days(conn, [STEERS])
+
+    header, row = Rollups.summary_rows(conn, [STEERS])
+    assert header[:6] == ["Type", "Weeks", "Coverage Level", "Week Avg Price", "30d Low", "30d High"]
+    assert row[:6] == ["Steers1", 13, "96.88%", "$248.55", "$247.10", "$250.00"]
+    assert row[-1] == "+0.14"
+
+def test_report_coverage_picks_the_nearest_row(tmp_path):
+    conn = Store.connect(str(tmp_path / "lrp.db"))
+    report = dict(STEERS, coverage=0.95)
+    ingest_days(conn, [report])
+
+    row = Rollups.summary_rows(conn, [report])[1]
+    assert row[2:6] == ["95.12%", "$244.00", "$243.00", "$245.00"]
+
+def test_rebuild_matches_incremental(tmp_path):
+    conn = Store.connect(str(tmp_path / "lrp.db"))
+    ingest_days(conn, [STEERS])
+    incremental = Rollups.summary_rows(conn, [STEERS])
+
+    Rollups.rebuild(conn, [STEERS])
+    assert Rollups.summary_rows(conn, [STEERS]) == incremental
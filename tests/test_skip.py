@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Config
+import Layout
+import Fingerprint
+import Run
+
+def write_layout(reports):
+    # layout.json as a previous run would have left it for these reports
+    blocks = Layout.compute_blocks(reports)
+    values = {b["name"]: [["x"] * 3] * (b["last_row"] - b["first_row"] + 1) for b in blocks}
+    Layout.save_layout(Config.SPREADSHEET_ID, Layout.plan_writes(blocks, values, {})["state"])
+
+def by_name(name):
+    return next(r for r in Config.REPORTS if r["name"] == name)
+
+def test_unchanged_layout_is_skipped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_layout(Config.REPORTS)
+
+    assert all(Run.written_everywhere(report) for report in Config.REPORTS)
+
+def test_inserted_report_rewrites_the_blocks_below(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_layout(Config.REPORTS)
+
+    reports = list(Config.REPORTS)
+    reports.insert(1, {"name": "Steers0", "type": "808|Steers Weight 0"})
+    monkeypatch.setattr(Config, "REPORTS", reports)
+
+    # The new block lands where Steers1 was, so everything after it moves down
+    assert Run.written_everywhere(by_name("Unborn"))
+    for name in ["Steers0", "Steers1", "Steers2", "Heifers1", "Heifers2"]:
+        assert not Run.written_everywhere(by_name(name))
+
+def test_changed_weeks_or_gap_moves_blocks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_layout(Config.REPORTS)
+
+    reports = [dict(r) for r in Config.REPORTS]
+    reports[2]["weeks"] = [13, 26]
+    monkeypatch.setattr(Config, "REPORTS", reports)
+
+    assert Run.written_everywhere(by_name("Steers1"))
+    assert not Run.written_everywhere(by_name("Steers2"))
+    assert not Run.written_everywhere(by_name("Heifers1"))
+
+def test_output_config_is_part_of_the_key():
+    selection = Run.report_selection(Config.REPORTS[0])
+    base = Fingerprint.report_key(*selection, Config.TARGET_VALUES, None)
+
+    assert Fingerprint.report_key(*selection, Config.TARGET_VALUES, 1.0) != base
+    assert Fingerprint.report_key(*selection, Config.TARGET_VALUES, 0.95) != \
+        Fingerprint.report_key(*selection, Config.TARGET_VALUES, 1.0)
+    assert Fingerprint.report_key(*selection, [13, 17], None) != base